@@ -0,0 +1,60 @@
+"""Contains a vectorized implementation of the CartPole dynamics for simulating many states at once."""
+from typing import Tuple
+
+import numpy as np
+
+from maze_cartpole.env.core_env import CartPoleCoreEnvironment
+
+
+class CartPoleBatchedDynamics:
+    """Vectorized CartPole dynamics (explicit Euler integration), matching the per state implementation of
+    :class:`~maze_cartpole.env.core_env.CartPoleCoreEnvironment` for a whole batch of states.
+    The physical constants default to the ones of the core env.
+
+    :param gravity: The gravitational acceleration.
+    :param masscart: The mass of the cart.
+    :param masspole: The mass of the pole.
+    :param length: Half the length of the pole.
+    :param force_mag: The magnitude of the force applied to the cart.
+    :param tau: Seconds between state updates.
+    """
+
+    def __init__(self, gravity: float = CartPoleCoreEnvironment.GRAVITY,
+                 masscart: float = CartPoleCoreEnvironment.MASSCART, masspole: float = CartPoleCoreEnvironment.MASSPOLE,
+                 length: float = CartPoleCoreEnvironment.LENGTH, force_mag: float = CartPoleCoreEnvironment.FORCE_MAG,
+                 tau: float = CartPoleCoreEnvironment.TAU):
+        self.gravity = gravity
+        self.masspole = masspole
+        self.total_mass = masspole + masscart
+        self.length = length
+        self.polemass_length = masspole * length
+        self.force_mag = force_mag
+        self.tau = tau
+        self.four_thirds = 4.0 / 3.0
+
+    def step(self, cart_position: np.ndarray, cart_velocity: np.ndarray, pole_angle: np.ndarray,
+             pole_velocity: np.ndarray, force: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Integrate a single physics tick for all states of the batch.
+
+        :param cart_position: The cart positions.
+        :param cart_velocity: The cart velocities.
+        :param pole_angle: The pole angles.
+        :param pole_velocity: The pole angular velocities.
+        :param force: The forces applied to the carts.
+        :return: Tuple of the updated (cart_position, cart_velocity, pole_angle, pole_velocity).
+        """
+        costheta = np.cos(pole_angle)
+        sintheta = np.sin(pole_angle)
+
+        # For the interested reader:
+        # https://coneural.org/florian/papers/05_cart_pole.pdf
+        # (same order of operations as in the core env, yielding the same results)
+        temp = (force + self.polemass_length * pole_velocity * pole_velocity * sintheta) / self.total_mass
+        thetaacc = (self.gravity * sintheta - costheta * temp) / (self.length * (self.four_thirds - self.masspole *
+                                                                                 costheta * costheta / self.total_mass))
+        xacc = temp - self.polemass_length * thetaacc * costheta / self.total_mass
+
+        return (cart_position + self.tau * cart_velocity,
+                cart_velocity + self.tau * xacc,
+                pole_angle + self.tau * pole_velocity,
+                pole_velocity + self.tau * thetaacc)
@@ -25,14 +25,37 @@ class CartPoleCoreEnvironment(CoreEnv):
     :param theta_threshold_radians: Angle at which to fail an episode (e.g., 12 * 2 * pi / 360 = 0.20943951).
     :param x_threshold: Position at which to fail an episode (e.g., 2.4).
     :param reward_aggregator: Either an instantiated aggregator or a configuration dictionary.
+    :param action_repeat: Number of physics ticks (of length tau) integrated with the same action in a single step.
+    :param precision: Floating point precision of the dynamics, either `float64` (Python floats) or `float32`
+                      (numpy float32 scalars, matching the precision of the observations and the networks).
     """
 
+    PRECISION_OPTIONS = ("float64", "float32")
+
+    # physical constants (also the defaults of the batched dynamics simulated by the planning policies)
+    GRAVITY = 9.8
+    MASSCART = 1.0
+    MASSPOLE = 0.1
+    LENGTH = 0.5  # actually half the pole's length
+    FORCE_MAG = 10.0
+    TAU = 0.02  # seconds between state updates
+
     def __init__(self, theta_threshold_radians: float, x_threshold: float,
-                 reward_aggregator: RewardAggregatorInterface):
+                 reward_aggregator: RewardAggregatorInterface, action_repeat: int = 1, precision: str = "float64"):
         super().__init__()
+        assert action_repeat >= 1, "at least one physics tick has to be integrated per step"
+        assert precision in self.PRECISION_OPTIONS, \
+            f"unknown precision '{precision}', expected one of {self.PRECISION_OPTIONS}"
 
         self.theta_threshold_radians = theta_threshold_radians
         self.x_threshold = x_threshold
+        self.action_repeat = action_repeat
+
+        # all state variables and constants are kept in this type, math functions are taken from the matching module
+        # (note that mixing numpy float32 scalars with Python floats would promote the result to float64)
+        self.precision = precision
+        self.dtype = np.float32 if precision == "float32" else float
+        self.math_module = np if precision == "float32" else math
 
         # init pubsub for event to reward routing
         self.pubsub = Pubsub(self.context.event_service)
@@ -61,19 +84,20 @@ class CartPoleCoreEnvironment(CoreEnv):
         """Setup environment."""
 
         # Setup env here
-        self.cart_position = self.env_rng.uniform(low=-0.05, high=0.05, size=(1,))[0]
-        self.cart_velocity = self.env_rng.uniform(low=-0.05, high=0.05, size=(1,))[0]
-        self.pole_angle = self.env_rng.uniform(low=-0.05, high=0.05, size=(1,))[0]
-        self.pole_velocity = self.env_rng.uniform(low=-0.05, high=0.05, size=(1,))[0]
-
-        self.gravity = 9.8
-        self.masscart = 1.0
-        self.masspole = 0.1
+        self.cart_position = self.dtype(self.env_rng.uniform(low=-0.05, high=0.05, size=(1,))[0])
+        self.cart_velocity = self.dtype(self.env_rng.uniform(low=-0.05, high=0.05, size=(1,))[0])
+        self.pole_angle = self.dtype(self.env_rng.uniform(low=-0.05, high=0.05, size=(1,))[0])
+        self.pole_velocity = self.dtype(self.env_rng.uniform(low=-0.05, high=0.05, size=(1,))[0])
+
+        self.gravity = self.dtype(self.GRAVITY)
+        self.masscart = self.dtype(self.MASSCART)
+        self.masspole = self.dtype(self.MASSPOLE)
         self.total_mass = (self.masspole + self.masscart)
-        self.length = 0.5  # actually half the pole's length
+        self.length = self.dtype(self.LENGTH)
         self.polemass_length = (self.masspole * self.length)
-        self.force_mag = 10.0
-        self.tau = 0.02  # seconds between state updates
+        self.force_mag = self.dtype(self.FORCE_MAG)
+        self.tau = self.dtype(self.TAU)
+        self.four_thirds = self.dtype(4.0 / 3.0)
         self.kinematics_integrator = 'euler'
 
         # Initialize the events for the env
@@ -84,10 +108,12 @@ class CartPoleCoreEnvironment(CoreEnv):
     def step(self, maze_action: CartPoleMazeAction) \
             -> Tuple[CartPoleMazeState, np.array, bool, Dict[Any, Any]]:
         """Summary of the step (simplified, not necessarily respecting the actual order in the code):
-        * Update the cart position and velocity
-        * Update the pole position and velocity
-        * Update events
-        * Calculate reward
+        * For each of the `action_repeat` physics ticks (stopping early on termination):
+            * Update the cart position and velocity
+            * Update the pole position and velocity
+            * Check the termination thresholds
+            * Calculate reward
+        * Update events (aggregated over the ticks)
 
         :param maze_action: MazeAction to take.
         :return: state, reward, done, info
@@ -97,14 +123,43 @@ class CartPoleCoreEnvironment(CoreEnv):
         # Implement you step function here and record events
 
         force = self.force_mag if maze_action.push_right else -self.force_mag
-        costheta = math.cos(self.pole_angle)
-        sintheta = math.sin(self.pole_angle)
+
+        done = False
+        reward = 0.0
+        total_velocity = self.dtype(0.0)
+        n_ticks = 0
+        while not done and n_ticks < self.action_repeat:
+            done = self._integrate_tick(force)
+            n_ticks += 1
+            total_velocity += self.cart_velocity
+            self.kpi_calculator.record_step(cart_velocity=self.cart_velocity)
+
+            # aggregate reward from events (accumulated over the ticks as if the env was stepped tick by tick)
+            reward += sum(self.reward_aggregator.summarize_reward(self.get_maze_state()))
+
+        # a single event per step, summed over the ticks (hence the episode totals are independent of the action repeat)
+        self.events.cart_velocity(velocity=total_velocity)
+
+        # compile env state
+        maze_state = self.get_maze_state()
+
+        return maze_state, reward, done, info
+
+    def _integrate_tick(self, force: float) -> bool:
+        """Integrate the dynamics for a single physics tick and check the termination thresholds.
+
+        :param force: The force applied to the cart.
+        :return: True if a termination threshold is exceeded after the tick.
+        """
+        costheta = self.math_module.cos(self.pole_angle)
+        sintheta = self.math_module.sin(self.pole_angle)
 
         # For the interested reader:
         # https://coneural.org/florian/papers/05_cart_pole.pdf
-        temp = (force + self.polemass_length * self.pole_velocity ** 2 * sintheta) / self.total_mass
-        thetaacc = (self.gravity * sintheta - costheta * temp) / (self.length * (4.0 / 3.0 - self.masspole *
-                                                                                 costheta ** 2 / self.total_mass))
+        # (squares are written as products, since numpy promotes float32 ** int to float64)
+        temp = (force + self.polemass_length * self.pole_velocity * self.pole_velocity * sintheta) / self.total_mass
+        thetaacc = (self.gravity * sintheta - costheta * temp) / (self.length * (self.four_thirds - self.masspole *
+                                                                                 costheta * costheta / self.total_mass))
         xacc = temp - self.polemass_length * thetaacc * costheta / self.total_mass
 
         if self.kinematics_integrator == 'euler':
@@ -126,15 +181,7 @@ class CartPoleCoreEnvironment(CoreEnv):
             done = True
             self.events.pole_fell_over()
 
-        self.events.cart_velocity(velocity=self.cart_velocity)
-
-        # compile env state
-        maze_state = self.get_maze_state()
-
-        # aggregate reward from events
-        rewards = self.reward_aggregator.summarize_reward(maze_state)
-
-        return maze_state, sum(rewards), done, info
+        return done
 
     @override(CoreEnv)
     def get_maze_state(self) -> CartPoleMazeState:
@@ -145,6 +192,7 @@ class CartPoleCoreEnvironment(CoreEnv):
     @override(CoreEnv)
     def reset(self) -> CartPoleMazeState:
         """Resets the environment to initial state."""
+        self.kpi_calculator.reset()
         self._setup_env()
         return self.get_maze_state()
 
@@ -23,5 +23,7 @@ class CartPoleEvents(ABC):
 
     @define_epoch_stats(np.mean, output_name="mean_episode_total")
     @define_episode_stats(sum)
+    @define_step_stats(sum)
     def cart_velocity(self, velocity: float):
-        """Record the average cart velocity."""
+        """Record the cart velocity, summed over the physics ticks of the step in case of action repeat
+        (i.e., the episode total is the same as when stepping tick by tick)."""
@@ -5,23 +5,39 @@ from maze.core.annotations import override
 from maze.core.env.maze_state import MazeStateType
 from maze.core.log_events.episode_event_log import EpisodeEventLog
 from maze.core.log_events.kpi_calculator import KpiCalculator
-from maze_cartpole.env.events import CartPoleEvents
 
 
 class CartPoleKpiCalculator(KpiCalculator):
     """Environment specific Key Performance Indicators (KPIs).
+
+    The KPIs are accumulated step by step by the core env (instead of being queried from the episode event log),
+    so they stay exact even if the event log retains only parts of the episode
+    (see :class:`~maze_cartpole.wrappers.bounded_event_log_wrapper.BoundedEventLogWrapper`).
+
+    Steps refer to physics ticks, which keeps the KPIs comparable across different action repeat settings
+    of the core env.
     """
 
+    def __init__(self):
+        self.step_count = 0
+        self.total_velocity = 0.0
+
+    def record_step(self, cart_velocity: float) -> None:
+        """Accumulate the KPI relevant quantities of a single step (i.e., physics tick).
+
+        :param cart_velocity: The velocity of the cart after the tick.
+        """
+        self.step_count += 1
+        self.total_velocity += cart_velocity
+
+    def reset(self) -> None:
+        """Start accumulating a new episode."""
+        self.step_count = 0
+        self.total_velocity = 0.0
+
     @override(KpiCalculator)
     def calculate_kpis(self, episode_event_log: EpisodeEventLog, last_maze_state: MazeStateType) -> Dict[str, float]:
         """Calculates the KPIs at the end of episode."""
 
-        # get overall step count of episode
-        step_count = len(episode_event_log.step_event_logs)
-
-        total_velocity = 0
-        for event in episode_event_log.query_events(CartPoleEvents.cart_velocity):
-            total_velocity += event.velocity
-
         # compute step normalized velocity of the cart
-        return {"average_cart_velocity_per_step": total_velocity / step_count}
+        return {"average_cart_velocity_per_step": self.total_velocity / self.step_count}
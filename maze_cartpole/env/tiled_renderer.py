@@ -0,0 +1,159 @@
+"""Contains a renderer drawing a whole population of CartPole envs into a single tiled image."""
+import math
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+
+from maze_cartpole.env.maze_state import CartPoleMazeState
+
+
+class CartPoleTiledRenderer:
+    """Matplotlib based rendering of many cart states at once, e.g. for monitoring dashboards.
+
+    In contrast to the :class:`~maze_cartpole.env.renderer.CartPoleRenderer`, all artists are created once and
+    only their vertices are updated from the stacked states (one collection per element for the whole tile grid).
+    Each frame is rasterized exactly once into an off-screen (Agg) canvas, independent of the pyplot state.
+
+    :param n_envs: Number of envs (i.e., tiles) to render.
+    :param pole_length: The (half) length of the pole to be balanced on the cart.
+    :param x_threshold: The threshold to the left and right indicating where the cart is allowed to move.
+    :param n_columns: Number of tiles per row (defaults to a square grid).
+    :param tile_size: Size of a single tile in inches (width, height).
+    :param dpi: Resolution of the rendered image.
+    """
+
+    # tile layout in screen units (as in the single env renderer)
+    TILE_WIDTH = 600
+    TILE_HEIGHT = 400
+    CART_Y = 100
+    CART_WIDTH = 50.0
+    CART_HEIGHT = 30.0
+    POLE_WIDTH = 10.0
+    WHEEL_RADIUS = 5.0
+
+    CART_COLOR = (0.7, 0.2, 0.2, 1.0)
+    DONE_CART_COLOR = (0.6, 0.6, 0.6, 1.0)
+
+    def __init__(self, n_envs: int, pole_length: float = 0.5, x_threshold: float = 2.4,
+                 n_columns: Optional[int] = None, tile_size: Tuple[float, float] = (2.0, 4.0 / 3.0),
+                 dpi: int = 72):
+        self.n_envs = n_envs
+        self.pole_length = pole_length
+        self.x_threshold = x_threshold
+        self.n_columns = n_columns if n_columns is not None else int(math.ceil(math.sqrt(n_envs)))
+        self.n_rows = int(math.ceil(n_envs / self.n_columns))
+
+        self.scale = self.TILE_WIDTH / (self.x_threshold * 2)
+
+        self.figure = Figure(figsize=(self.n_columns * tile_size[0], self.n_rows * tile_size[1]), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_axes([0, 0, 1, 1])
+        self.ax.set_xlim([0, self.n_columns * self.TILE_WIDTH])
+        self.ax.set_ylim([0, self.n_rows * self.TILE_HEIGHT])
+        self.ax.axis('off')
+
+        # lower left corner of each tile, filled row by row starting at the top
+        tile_ids = np.arange(n_envs)
+        self.tile_origins = np.stack([(tile_ids % self.n_columns) * self.TILE_WIDTH,
+                                      (self.n_rows - 1 - tile_ids // self.n_columns) * self.TILE_HEIGHT],
+                                     axis=-1).astype(np.float64)
+
+        # static artists: tile frames and rails
+        self.ax.add_collection(PolyCollection(
+            self._rectangles(self.tile_origins, self.TILE_WIDTH, self.TILE_HEIGHT),
+            facecolors='none', edgecolors=(0.8, 0.8, 0.8), linewidths=0.5))
+        self.ax.add_collection(PolyCollection(
+            self._rectangles(self.tile_origins + [0, self.CART_Y - 4], self.TILE_WIDTH, 5),
+            facecolors=(0, 0, 0)))
+
+        # dynamic artists, updated on each frame
+        self.carts = PolyCollection([], facecolors=self.CART_COLOR)
+        self.poles = PolyCollection([], facecolors=(.8, .6, .4))
+        self.ax.add_collection(self.carts)
+        self.ax.add_collection(self.poles)
+
+        points_per_unit = tile_size[0] * 72 / self.TILE_WIDTH
+        self.wheels = self.ax.scatter(np.zeros(2 * n_envs), np.zeros(2 * n_envs), color=(0, 0, 0),
+                                      s=(2 * self.WHEEL_RADIUS * points_per_unit) ** 2)
+
+        self.labels = [self.ax.text(origin[0] + 10, origin[1] + self.TILE_HEIGHT - 10, s='', va='top',
+                                    fontsize=max(4.0, 0.1 * tile_size[1] * 72))
+                       for origin in self.tile_origins]
+
+    @staticmethod
+    def stack_states(maze_states: Sequence[CartPoleMazeState]) -> np.ndarray:
+        """Stack the given maze states into an array of shape (n_envs, 4).
+
+        :param maze_states: The maze states to stack.
+        :return: Array holding cart position, cart velocity, pole angle and pole angular velocity per env.
+        """
+        return np.array([[maze_state.cart_position, maze_state.cart_velocity,
+                          maze_state.pole_angle, maze_state.pole_angular_velocity] for maze_state in maze_states],
+                        dtype=np.float64)
+
+    def render(self, states: np.ndarray, labels: Optional[Sequence[str]] = None,
+               dones: Optional[Sequence[bool]] = None) -> np.ndarray:
+        """Render all cart states into a single tiled image.
+
+        :param states: The stacked states of shape (n_envs, 4), see :meth:`stack_states`.
+        :param labels: Optional per env labels (e.g. the step count), printed in the upper left corner of each tile.
+        :param dones: Optional per env done flags, the carts of done envs are grayed out.
+        :return: The rendered RGB image of shape (height, width, 3).
+        """
+        assert states.shape == (self.n_envs, 4), f"expected states of shape {(self.n_envs, 4)}, got {states.shape}"
+
+        cart_position = np.clip(states[:, 0], -self.x_threshold, self.x_threshold)
+        pole_angle = states[:, 2]
+
+        # cart centered at its position
+        cart_x = self.tile_origins[:, 0] + self.TILE_WIDTH / 2.0 + cart_position * self.scale
+        cart_y = self.tile_origins[:, 1] + self.CART_Y + self.WHEEL_RADIUS
+        cart_corners = np.stack([cart_x - self.CART_WIDTH / 2, cart_y], axis=-1)
+        self.carts.set_verts(self._rectangles(cart_corners, self.CART_WIDTH, self.CART_HEIGHT))
+
+        # pole rotated around the center of its base (positive angles lean to the right)
+        pole_len = self.scale * (2 * self.pole_length)
+        base = np.stack([cart_x, cart_y + self.CART_HEIGHT / 2], axis=-1)
+        direction = np.stack([np.sin(pole_angle), np.cos(pole_angle)], axis=-1)
+        normal = np.stack([direction[:, 1], -direction[:, 0]], axis=-1) * (self.POLE_WIDTH / 2)
+        self.poles.set_verts(np.stack([base - normal, base + normal,
+                                       base + normal + pole_len * direction,
+                                       base - normal + pole_len * direction], axis=1))
+
+        wheel_y = np.concatenate([cart_y, cart_y])
+        wheel_x = np.concatenate([cart_x - self.CART_WIDTH / 4, cart_x + self.CART_WIDTH / 4])
+        self.wheels.set_offsets(np.stack([wheel_x, wheel_y], axis=-1))
+
+        face_colors = np.tile(self.CART_COLOR, (self.n_envs, 1))
+        if dones is not None:
+            face_colors[np.asarray(dones, dtype=bool)] = self.DONE_CART_COLOR
+        self.carts.set_facecolors(face_colors)
+
+        for text, label in zip(self.labels, labels if labels is not None else [''] * self.n_envs):
+            text.set_text(label)
+
+        # rasterize once and return a copy of the RGB buffer
+        self.canvas.draw()
+        return np.asarray(self.canvas.buffer_rgba())[..., :3].copy()
+
+    def save(self, file_path: str) -> None:
+        """Save the last rendered frame.
+
+        :param file_path: The path of the image file.
+        """
+        self.figure.savefig(file_path)
+
+    @staticmethod
+    def _rectangles(lower_left: np.ndarray, width: float, height: float) -> np.ndarray:
+        """Vertices of axis aligned rectangles.
+
+        :param lower_left: Lower left corners of shape (n, 2).
+        :param width: Width of the rectangles.
+        :param height: Height of the rectangles.
+        :return: Vertices of shape (n, 4, 2).
+        """
+        offsets = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float64)
+        return lower_left[:, np.newaxis, :] + offsets[np.newaxis, :, :]
@@ -0,0 +1,141 @@
+"""Model predictive control baseline policy for the CartPole env."""
+from typing import Sequence, Tuple, Optional
+
+import numpy as np
+
+from maze.core.agent.policy import Policy
+from maze.core.annotations import override
+from maze.core.env.action_conversion import ActionType
+from maze.core.env.base_env import BaseEnv
+from maze.core.env.maze_state import MazeStateType
+from maze.core.env.observation_conversion import ObservationType
+from maze.core.env.structured_env import ActorID
+from maze_cartpole.env.batched_dynamics import CartPoleBatchedDynamics
+from maze_cartpole.env.maze_state import CartPoleMazeState
+
+
+class CartPoleMPCPolicy(Policy):
+    """Model predictive control policy, planning on the CartPole dynamics.
+
+    At each decision, `n_samples` action sequences of length `horizon` are simulated at once from the current maze
+    state with the vectorized dynamics. If `n_samples` covers all 2^horizon sequences, these are enumerated,
+    otherwise they are sampled uniformly at random. Each sequence is scored by the number of steps it survives,
+    minus a cost on the normalized |pole_angle| and |cart_position| accumulated over the surviving steps.
+    The first action of the best sequence is taken.
+
+    :param theta_threshold_radians: Angle at which an episode fails.
+    :param x_threshold: Position at which an episode fails.
+    :param horizon: Number of steps to plan ahead.
+    :param n_samples: Number of action sequences simulated per decision.
+    :param angle_weight: Weight of the (threshold normalized) |pole_angle| cost per step.
+    :param position_weight: Weight of the (threshold normalized) |cart_position| cost per step.
+    """
+
+    def __init__(self, theta_threshold_radians: float, x_threshold: float, horizon: int = 10,
+                 n_samples: int = 1024, angle_weight: float = 0.5, position_weight: float = 0.1):
+        assert horizon >= 1 and n_samples >= 2
+        self.theta_threshold_radians = theta_threshold_radians
+        self.x_threshold = x_threshold
+        self.horizon = horizon
+        self.n_samples = n_samples
+        self.angle_weight = angle_weight
+        self.position_weight = position_weight
+
+        self.dynamics = CartPoleBatchedDynamics()
+        self.rng = np.random.RandomState(None)
+
+        # enumerate all action sequences if affordable (the bits of the sequence id are the actions)
+        self.enumerate_sequences = n_samples >= 2 ** horizon
+        if self.enumerate_sequences:
+            sequence_ids = np.arange(2 ** horizon)[:, np.newaxis]
+            self.action_sequences = (sequence_ids >> np.arange(horizon)[np.newaxis, :]) & 1
+            self.forces = self._to_forces(self.action_sequences)
+        else:
+            self.action_sequences = None
+            self.forces = None
+
+    @override(Policy)
+    def needs_state(self) -> bool:
+        """implementation of :class:`~maze.core.agent.policy.Policy` interface
+        """
+        return True
+
+    @override(Policy)
+    def seed(self, seed: int) -> None:
+        """Seed the sampling of action sequences (not applicable if all sequences are enumerated)."""
+        self.rng = np.random.RandomState(seed)
+
+    @override(Policy)
+    def compute_action(self, observation: ObservationType, maze_state: Optional[MazeStateType] = None,
+                       env: Optional[BaseEnv] = None, actor_id: ActorID = None, deterministic: bool = False
+                       ) -> ActionType:
+        """implementation of :class:`~maze.core.agent.policy.Policy` interface
+        """
+        action_sequences, scores = self._plan(maze_state)
+        return {"action": int(action_sequences[np.argmax(scores), 0])}
+
+    @override(Policy)
+    def compute_top_action_candidates(self, observation: ObservationType, num_candidates: Optional[int],
+                                      maze_state: Optional[MazeStateType], env: Optional[BaseEnv],
+                                      actor_id: ActorID = None) \
+            -> Tuple[Sequence[ActionType], Sequence[float]]:
+        """implementation of :class:`~maze.core.agent.policy.Policy` interface, ranking both actions by the score
+        of the best sequence starting with them.
+        """
+        action_sequences, scores = self._plan(maze_state)
+
+        candidates = []
+        for action in (0, 1):
+            first_action_scores = scores[action_sequences[:, 0] == action]
+            if len(first_action_scores) > 0:
+                candidates.append((float(np.max(first_action_scores)), action))
+        candidates.sort(reverse=True)
+        candidates = candidates[:num_candidates]
+
+        return [{"action": action} for _, action in candidates], [score for score, _ in candidates]
+
+    def _to_forces(self, action_sequences: np.ndarray) -> np.ndarray:
+        """Convert the action sequences into the forces applied to the carts.
+
+        :param action_sequences: Action sequences of shape (n_samples, horizon).
+        :return: The forces of shape (horizon, n_samples), contiguous per planning step.
+        """
+        return np.ascontiguousarray((2 * action_sequences.T - 1) * self.dynamics.force_mag, dtype=np.float64)
+
+    def _plan(self, maze_state: CartPoleMazeState) -> Tuple[np.ndarray, np.ndarray]:
+        """Simulate all action sequences from the given state.
+
+        :param maze_state: The current state of the env.
+        :return: Tuple of (action sequences of shape (n_samples, horizon), score per sequence).
+        """
+        if self.enumerate_sequences:
+            action_sequences, forces = self.action_sequences, self.forces
+        else:
+            action_sequences = self.rng.randint(2, size=(self.n_samples, self.horizon))
+            forces = self._to_forces(action_sequences)
+
+        n_sequences = len(action_sequences)
+        cart_position = np.full(n_sequences, maze_state.cart_position, dtype=np.float64)
+        cart_velocity = np.full(n_sequences, maze_state.cart_velocity, dtype=np.float64)
+        pole_angle = np.full(n_sequences, maze_state.pole_angle, dtype=np.float64)
+        pole_velocity = np.full(n_sequences, maze_state.pole_angular_velocity, dtype=np.float64)
+
+        # the costs are normalized by the thresholds
+        angle_weight = self.angle_weight / self.theta_threshold_radians
+        position_weight = self.position_weight / self.x_threshold
+
+        alive = np.ones(n_sequences, dtype=bool)
+        scores = np.zeros(n_sequences, dtype=np.float64)
+        for step in range(self.horizon):
+            cart_position, cart_velocity, pole_angle, pole_velocity = self.dynamics.step(
+                cart_position, cart_velocity, pole_angle, pole_velocity, forces[step])
+
+            # same threshold semantics as in the core env (failing when strictly beyond the thresholds)
+            abs_angle = np.abs(pole_angle)
+            abs_position = np.abs(cart_position)
+            alive &= (abs_angle <= self.theta_threshold_radians) & (abs_position <= self.x_threshold)
+
+            # reward of one per surviving step, minus the cost of the state
+            scores += alive * (1.0 - angle_weight * abs_angle - position_weight * abs_position)
+
+        return action_sequences, scores
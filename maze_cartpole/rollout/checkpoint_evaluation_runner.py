@@ -0,0 +1,305 @@
+"""Evaluation of many trained checkpoints in parallel processes, with an on-disk result cache."""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from hydra.utils import to_absolute_path
+from omegaconf import DictConfig, ListConfig, OmegaConf
+
+from maze.core.agent.policy import Policy
+from maze.core.annotations import override
+from maze.core.env.maze_env import MazeEnv
+from maze.core.env.observation_conversion import ObservationType
+from maze.core.rollout.rollout_runner import RolloutRunner
+from maze.core.utils.config_utils import EnvFactory, SwitchWorkingDirectoryToInput
+from maze.core.utils.factory import ConfigType, CollectionOfConfigType, Factory
+from maze.core.wrappers.time_limit_wrapper import TimeLimitWrapper
+from maze.utils.bcolors import BColors
+from maze_cartpole.env.events import CartPoleEvents
+
+# files of a training output directory identifying the checkpoint (if present)
+CHECKPOINT_FILES = ("state_dict.pt", "spaces_config.pkl", "statistics.pkl")
+
+# part of the cache key, to be increased whenever the evaluation itself changes (invalidating all cached results)
+RESULTS_VERSION = 3
+
+
+class _EvaluationSlot:
+    """Book-keeping of a single environment of the evaluation population.
+
+    :param env: The (fully wrapped) environment.
+    """
+
+    def __init__(self, env: MazeEnv):
+        self.env = env
+        self.observation: Optional[ObservationType] = None
+        self.seed_idx: Optional[int] = None
+        self.n_steps = 0
+
+        # the step events are cleared at the end of each step, hence the terminal events are captured by a post-step
+        # callback (running before the events are cleared)
+        self.terminal_events = set()
+        env.context.register_post_step(self._capture_terminal_events)
+
+    def start_episode(self, seed_idx: int, seed: int) -> None:
+        """Seed and reset the env for the episode of the given evaluation seed.
+
+        :param seed_idx: Index of the seed within the evaluation seeds.
+        :param seed: The env seed.
+        """
+        self.seed_idx = seed_idx
+        self.n_steps = 0
+        self.terminal_events.clear()
+        self.env.seed(seed)
+        self.observation = self.env.reset()
+
+    def _capture_terminal_events(self) -> None:
+        """Record the terminal events of the current step (post-step callback)."""
+        self.terminal_events.clear()
+        self.terminal_events.update(event.interface_method for event in self.env.get_step_events()
+                                    if event.interface_method in (CartPoleEvents.pole_fell_over,
+                                                                  CartPoleEvents.cart_moved_away))
+
+
+def evaluate_checkpoint(checkpoint_dir: str, env: ConfigType, wrappers: CollectionOfConfigType, agent: ConfigType,
+                        eval_seeds: Sequence[int], max_episode_steps: int, deterministic: bool,
+                        n_envs: int) -> Dict[str, Any]:
+    """Roll out the policy of a single checkpoint for all evaluation seeds (executed in the worker processes).
+
+    The seeds are run as a batch: a population of `n_envs` envs is stepped in lockstep, each env starting the episode
+    of the next pending seed once its episode is done. The agent is shared by the population and seeded only once
+    (with the first evaluation seed), hence stochastic rollouts depend on the population size (deterministic rollouts
+    do not).
+
+    :param checkpoint_dir: The training output directory to load the policy (and e.g. normalization statistics) from.
+    :param env: Env config.
+    :param wrappers: Wrappers config.
+    :param agent: Agent config, with paths relative to the checkpoint directory.
+    :param eval_seeds: The env seed of each evaluation episode.
+    :param max_episode_steps: Step limit of the episodes (0 for no limit).
+    :param deterministic: Deterministic or stochastic action sampling.
+    :param n_envs: Size of the env population.
+    :return: Dictionary holding the episode lengths, the KPIs per episode and the failure mode counts (in the order
+             of the evaluation seeds).
+    """
+    assert len(eval_seeds) > 0, "at least one evaluation seed is required"
+
+    with SwitchWorkingDirectoryToInput(checkpoint_dir):
+        agent = Factory(base_type=Policy).instantiate(agent)
+
+        slots = []
+        for _ in range(min(n_envs, len(eval_seeds))):
+            slot_env = EnvFactory(env, wrappers)()
+            if not isinstance(slot_env, TimeLimitWrapper):
+                slot_env = TimeLimitWrapper.wrap(slot_env)
+            slot_env.set_max_episode_steps(max_episode_steps)
+            slots.append(_EvaluationSlot(slot_env))
+
+    agent.seed(eval_seeds[0])
+    agent.reset()
+
+    episode_lengths = [0] * len(eval_seeds)
+    average_cart_velocities = [0.0] * len(eval_seeds)
+    failure_modes = {"pole_fell_over": 0, "cart_moved_away": 0, "survived": 0}
+
+    for seed_idx, slot in enumerate(slots):
+        slot.start_episode(seed_idx=seed_idx, seed=eval_seeds[seed_idx])
+    n_episodes_started = len(slots)
+
+    active_slots = slots
+    while active_slots:
+        # compute the actions of the whole population, then step all envs
+        actions = [agent.compute_action(observation=slot.observation,
+                                        actor_id=slot.env.actor_id(),
+                                        maze_state=slot.env.get_maze_state() if agent.needs_state() else None,
+                                        env=slot.env if agent.needs_env() else None,
+                                        deterministic=deterministic)
+                   for slot in active_slots]
+
+        next_active_slots = []
+        for slot, action in zip(active_slots, actions):
+            slot.observation, _, done, _ = slot.env.step(action)
+            slot.n_steps += 1
+            if not done:
+                next_active_slots.append(slot)
+                continue
+
+            # the terminal events of the last step tell why the episode ended (otherwise the step limit was reached)
+            if CartPoleEvents.pole_fell_over in slot.terminal_events:
+                failure_modes["pole_fell_over"] += 1
+            if CartPoleEvents.cart_moved_away in slot.terminal_events:
+                failure_modes["cart_moved_away"] += 1
+            if not slot.terminal_events:
+                failure_modes["survived"] += 1
+
+            # the CartPole KPIs are accumulated by the env, independent of the event log
+            kpis = slot.env.get_kpi_calculator().calculate_kpis(episode_event_log=None,
+                                                                last_maze_state=slot.env.get_maze_state())
+            episode_lengths[slot.seed_idx] = slot.n_steps
+            average_cart_velocities[slot.seed_idx] = float(kpis["average_cart_velocity_per_step"])
+
+            if n_episodes_started < len(eval_seeds):
+                slot.start_episode(seed_idx=n_episodes_started, seed=eval_seeds[n_episodes_started])
+                n_episodes_started += 1
+                next_active_slots.append(slot)
+
+        active_slots = next_active_slots
+
+    for slot in slots:
+        slot.env.close()
+
+    return {"checkpoint_dir": checkpoint_dir,
+            "episode_lengths": episode_lengths,
+            "mean_episode_length": float(np.mean(episode_lengths)),
+            "average_cart_velocity_per_step": average_cart_velocities,
+            "mean_average_cart_velocity_per_step": float(np.mean(average_cart_velocities)),
+            "failure_modes": failure_modes}
+
+
+class CheckpointEvaluationRunner(RolloutRunner):
+    """Evaluates the policies of many training output directories (checkpoints) on a fixed set of seeds.
+
+    The checkpoints are fanned out over a process pool, each worker evaluating one checkpoint for all seeds
+    (with a population of `n_envs` envs stepped in lockstep, see :func:`evaluate_checkpoint`).
+    Results are cached on disk, keyed by the hash of the checkpoint files, the hash of the evaluation config
+    (env, wrappers, policy, step limit, sampling mode and, for stochastic sampling, the population size) and the hash of the seed set. Hence, re-evaluations are
+    served from the cache and new checkpoints only cost their own rollouts.
+
+    The agent config is loaded relative to each checkpoint directory, as is done for the `input_dir`
+    of regular rollouts (e.g. `policy=torch_policy`).
+
+    :param checkpoint_dirs: The training output directories to evaluate.
+    :param eval_seeds: The env seeds of the evaluation episodes (defaults to 0, ..., n_episodes - 1). The first seed
+                       is also the agent seed.
+    :param n_episodes: Number of evaluation episodes if no explicit seeds are given.
+    :param max_episode_steps: Step limit of the evaluation episodes (0 for no limit).
+    :param deterministic: Deterministic or stochastic action sampling.
+    :param n_processes: Number of worker processes.
+    :param n_envs: Size of the env population of each worker.
+    :param cache_dir: Directory of the result cache (relative paths are relative to the original working directory).
+    :param results_file: File to write the results of all checkpoints to (in the Hydra output directory).
+    """
+
+    def __init__(self,
+                 checkpoint_dirs: List[str],
+                 eval_seeds: Optional[List[int]],
+                 n_episodes: int,
+                 max_episode_steps: int,
+                 deterministic: bool,
+                 n_processes: int,
+                 n_envs: int,
+                 cache_dir: str,
+                 results_file: str):
+        super().__init__(n_episodes=n_episodes, max_episode_steps=max_episode_steps, deterministic=deterministic,
+                         record_trajectory=False, record_event_logs=False)
+        self.checkpoint_dirs = [to_absolute_path(checkpoint_dir) for checkpoint_dir in checkpoint_dirs]
+        self.eval_seeds = list(eval_seeds) if eval_seeds is not None else list(range(n_episodes))
+        self.n_processes = n_processes
+        self.n_envs = n_envs
+        self.cache_dir = to_absolute_path(cache_dir)
+        self.results_file = results_file
+
+    @override(RolloutRunner)
+    def run_with(self, env: ConfigType, wrappers: CollectionOfConfigType, agent: ConfigType) -> None:
+        """Evaluate all checkpoints and write the results."""
+        results = self.evaluate(env=env, wrappers=wrappers, agent=agent, checkpoint_dirs=self.checkpoint_dirs)
+
+        for checkpoint_dir, result in results.items():
+            if "error" in result:
+                continue
+            BColors.print_colored(f"{checkpoint_dir}: mean episode length {result['mean_episode_length']:.1f}, "
+                                  f"mean average cart velocity per step "
+                                  f"{result['mean_average_cart_velocity_per_step']:.4f}, "
+                                  f"failure modes {result['failure_modes']}", BColors.OKGREEN)
+
+        with open(self.results_file, "w") as out_file:
+            json.dump(results, out_file, indent=2)
+
+    def evaluate(self, env: ConfigType, wrappers: CollectionOfConfigType, agent: ConfigType,
+                 checkpoint_dirs: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Evaluate the given checkpoints, running the rollouts only for those not present in the cache.
+
+        :param env: Env config.
+        :param wrappers: Wrappers config.
+        :param agent: Agent config, with paths relative to the checkpoint directories.
+        :param checkpoint_dirs: The training output directories to evaluate.
+        :return: The evaluation results by checkpoint directory.
+        """
+        env, wrappers, agent = (self._to_container(config) for config in (env, wrappers, agent))
+        config_hash = self._hash_json({"env": env, "wrappers": wrappers, "agent": agent,
+                                       "max_episode_steps": self.max_episode_steps,
+                                       "deterministic": self.deterministic,
+                                       # stochastic rollouts depend on the population size (deterministic ones do not)
+                                       "n_envs": None if self.deterministic else self.n_envs,
+                                       "results_version": RESULTS_VERSION})
+        seeds_hash = self._hash_json(self.eval_seeds)
+
+        results = dict()
+        cache_files = dict()
+        for checkpoint_dir in checkpoint_dirs:
+            cache_key = f"{self._hash_checkpoint(checkpoint_dir)}-{config_hash}-{seeds_hash}"
+            cache_files[checkpoint_dir] = os.path.join(self.cache_dir, f"{cache_key}.json")
+            if os.path.exists(cache_files[checkpoint_dir]):
+                with open(cache_files[checkpoint_dir]) as in_file:
+                    results[checkpoint_dir] = dict(json.load(in_file), checkpoint_dir=checkpoint_dir)
+
+        pending = [checkpoint_dir for checkpoint_dir in checkpoint_dirs if checkpoint_dir not in results]
+        BColors.print_colored(f'{len(checkpoint_dirs) - len(pending)} checkpoint(s) served from the cache, '
+                              f'evaluating {len(pending)} checkpoint(s).', BColors.OKBLUE)
+        if not pending:
+            return results
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=min(self.n_processes, len(pending))) as executor:
+            futures = {checkpoint_dir: executor.submit(evaluate_checkpoint, checkpoint_dir, env, wrappers, agent,
+                                                       self.eval_seeds, self.max_episode_steps, self.deterministic,
+                                                       self.n_envs)
+                       for checkpoint_dir in pending}
+
+            for checkpoint_dir, future in futures.items():
+                try:
+                    results[checkpoint_dir] = future.result()
+                except Exception as exception:
+                    BColors.print_colored(f'An error was encountered during the evaluation of {checkpoint_dir}: '
+                                          f'{exception}', BColors.FAIL)
+                    results[checkpoint_dir] = {"checkpoint_dir": checkpoint_dir, "error": str(exception)}
+                    continue
+
+                # write to a temporary file first, so that interrupted runs do not leave corrupt cache entries
+                tmp_file = f"{cache_files[checkpoint_dir]}.{os.getpid()}.tmp"
+                with open(tmp_file, "w") as out_file:
+                    json.dump(results[checkpoint_dir], out_file)
+                os.replace(tmp_file, cache_files[checkpoint_dir])
+
+        return results
+
+    @staticmethod
+    def _to_container(config: Any) -> Any:
+        """Convert Hydra configs into plain (picklable) Python containers with all interpolations resolved."""
+        if isinstance(config, (DictConfig, ListConfig)):
+            return OmegaConf.to_container(config, resolve=True)
+        return config
+
+    @staticmethod
+    def _hash_json(value: Any) -> str:
+        """Hash of the JSON representation of the given value (with sorted keys)."""
+        return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _hash_checkpoint(checkpoint_dir: str) -> str:
+        """Hash of the names and contents of the checkpoint files present in the given directory."""
+        checkpoint_hash = hashlib.sha256()
+        for file_name in CHECKPOINT_FILES:
+            file_path = os.path.join(checkpoint_dir, file_name)
+            if not os.path.exists(file_path):
+                continue
+
+            checkpoint_hash.update(file_name.encode())
+            with open(file_path, "rb") as in_file:
+                for chunk in iter(lambda: in_file.read(1 << 20), b""):
+                    checkpoint_hash.update(chunk)
+
+        return checkpoint_hash.hexdigest()[:16]
@@ -0,0 +1,25 @@
+"""Contains the statistics events emitted by the project specific rollout runners."""
+from abc import ABC
+
+import numpy as np
+from maze.core.log_stats.event_decorators import define_epoch_stats
+
+
+class PipelinedRolloutEvents(ABC):
+    """Event interface, defining the statistics emitted by the PipelinedRolloutRunner."""
+
+    @define_epoch_stats(np.mean)
+    def time_env_step(self, value: float):
+        """Accumulated time spent stepping the environments (main thread)."""
+
+    @define_epoch_stats(np.mean)
+    def time_policy(self, value: float):
+        """Accumulated time spent computing actions (inference thread)."""
+
+    @define_epoch_stats(np.mean)
+    def time_rollout(self, value: float):
+        """Wall clock time of the whole rollout."""
+
+    @define_epoch_stats(np.mean)
+    def overlap(self, value: float):
+        """Fraction of the shorter of the two stages that was hidden behind the other one ([0, 1])."""
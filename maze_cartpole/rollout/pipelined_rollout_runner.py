@@ -0,0 +1,259 @@
+"""Pipelined rollout runner overlapping env stepping and policy inference in the local process."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Any, Optional
+
+from tqdm import tqdm
+
+from maze.core.agent.policy import Policy
+from maze.core.annotations import override
+from maze.core.env.action_conversion import ActionType
+from maze.core.env.observation_conversion import ObservationType
+from maze.core.log_events.log_events_writer_registry import LogEventsWriterRegistry
+from maze.core.log_events.log_events_writer_tsv import LogEventsWriterTSV
+from maze.core.log_stats.log_stats import register_log_stats_writer, LogStatsAggregator, LogStatsLevel, \
+    get_stats_logger
+from maze.core.log_stats.log_stats_writer_console import LogStatsWriterConsole
+from maze.core.rollout.rollout_runner import RolloutRunner
+from maze.core.trajectory_recording.writers.trajectory_writer_file import TrajectoryWriterFile
+from maze.core.trajectory_recording.writers.trajectory_writer_registry import TrajectoryWriterRegistry
+from maze.core.utils.config_utils import EnvFactory, SwitchWorkingDirectoryToInput
+from maze.core.utils.factory import ConfigType, CollectionOfConfigType, Factory
+from maze.core.wrappers.log_stats_wrapper import LogStatsWrapper
+from maze.core.wrappers.time_limit_wrapper import TimeLimitWrapper
+from maze.core.wrappers.trajectory_recording_wrapper import TrajectoryRecordingWrapper
+from maze.utils.bcolors import BColors
+from maze_cartpole.rollout.events import PipelinedRolloutEvents
+
+
+class _EnvSlot:
+    """Book-keeping of a single environment of the population.
+
+    :param env: The (fully wrapped) environment.
+    """
+
+    def __init__(self, env: LogStatsWrapper):
+        self.env = env
+        self.observation: Optional[ObservationType] = None
+        self.active = False
+
+
+class PipelinedRolloutRunner(RolloutRunner):
+    """Runs rollouts of an env population in the local process, overlapping env stepping and policy inference.
+
+    The population is split into two halves. While the policy computes the actions for the observations of one half
+    in a worker thread (torch releases the GIL during inference), the main thread steps the envs of the other half.
+
+    Policy calls are issued in exactly the same order as without overlap (set `overlap` to False), hence
+    both modes produce identical rollouts for a fixed seed. With deterministic action selection, each episode is
+    moreover identical to the same episode (i.e., same env seed) run by the
+    :class:`~maze.core.rollout.sequential_rollout_runner.SequentialRolloutRunner`. Note that the agent is shared by
+    the whole population and is therefore seeded only once (with the first agent seed). Hence, with stochastic action
+    sampling, rollouts are still reproducible for a fixed seed (with and without overlap), but the single episodes
+    differ from those of the sequential runner, which reseeds the agent for every episode.
+
+    :param n_episodes: Count of episodes to run.
+    :param max_episode_steps: Count of steps to run in each episode (if environment returns done, the episode
+                              will be finished earlier though).
+    :param deterministic: Deterministic or stochastic action sampling.
+    :param record_trajectory: Whether to record trajectory data.
+    :param record_event_logs: Whether to record event logs.
+    :param n_envs: Size of the env population (split into two halves, thus at least 2).
+    :param overlap: If True, policy inference runs in a worker thread concurrently to env stepping.
+    """
+
+    def __init__(self,
+                 n_episodes: int,
+                 max_episode_steps: int,
+                 deterministic: bool,
+                 record_trajectory: bool,
+                 record_event_logs: bool,
+                 n_envs: int,
+                 overlap: bool):
+        super().__init__(n_episodes=n_episodes, max_episode_steps=max_episode_steps, deterministic=deterministic,
+                         record_trajectory=record_trajectory, record_event_logs=record_event_logs)
+        assert n_envs >= 2, "The env population is split into two halves and needs to consist of at least 2 envs."
+
+        self.n_envs = n_envs
+        self.overlap = overlap
+
+        self.progress_bar = None
+        self.epoch_stats: Optional[LogStatsAggregator] = None
+
+        self._env_seeds: List[Any] = []
+        self._n_episodes_started = 0
+        self._time_env_step = 0.0
+        self._time_policy = 0.0
+
+    @override(RolloutRunner)
+    def run_with(self, env: ConfigType, wrappers: CollectionOfConfigType, agent: ConfigType) -> None:
+        """Run the pipelined rollout in the main process (plus a single inference thread)."""
+        env_seeds = self.maze_seeding.get_explicit_env_seeds(self.n_episodes)
+        agent_seeds = self.maze_seeding.get_explicit_agent_seeds(self.n_episodes)
+
+        # Set up the stats and writers
+        # Hydra handles working directory
+        register_log_stats_writer(LogStatsWriterConsole())
+        if self.record_event_logs:
+            LogEventsWriterRegistry.register_writer(LogEventsWriterTSV(log_dir="./event_logs"))
+        if self.record_trajectory:
+            TrajectoryWriterRegistry.register_writer(TrajectoryWriterFile(log_dir="./trajectory_data"))
+
+        self.epoch_stats = LogStatsAggregator(LogStatsLevel.EPOCH, get_stats_logger("rollout_data"))
+        pipeline_stats = LogStatsAggregator(LogStatsLevel.EPOCH, get_stats_logger("pipeline_data"))
+        pipeline_events = pipeline_stats.create_event_topic(PipelinedRolloutEvents)
+
+        envs, agent = self._init_population(env_config=env, wrappers_config=wrappers, agent_config=agent)
+        agent.seed(agent_seeds[0])
+        if not self.deterministic:
+            BColors.print_colored('Stochastic action sampling with a single agent shared by the whole population: '
+                                  'rollouts are reproducible for a fixed seed, but episodes differ from the '
+                                  'episodes of the sequential runner.', BColors.WARNING)
+
+        actual_number_of_episodes = min(len(env_seeds), self.n_episodes)
+        if actual_number_of_episodes < self.n_episodes:
+            BColors.print_colored(f'Only {len(env_seeds)} explicit seed(s) given, thus the number of episodes changed '
+                                  f'from: {self.n_episodes} to {actual_number_of_episodes}.', BColors.WARNING)
+        self._env_seeds = env_seeds[:actual_number_of_episodes]
+        self.progress_bar = tqdm(desc="Episodes done", unit=" episodes", total=actual_number_of_episodes)
+
+        start_time = time.time()
+        self._run_pipeline(slots=[_EnvSlot(env) for env in envs], agent=agent)
+        time_rollout = time.time() - start_time
+
+        self.progress_bar.close()
+        # flush the last episode of each env into the stats of the whole population
+        for env in envs:
+            env.write_epoch_stats()
+        if len(self.epoch_stats.input) != 0:
+            self.epoch_stats.reduce()
+
+        # report how much of the shorter stage was hidden behind the longer one
+        shorter_stage = min(self._time_env_step, self._time_policy)
+        overlap = 0.0
+        if shorter_stage > 0:
+            overlap = min(1.0, max(0.0, self._time_env_step + self._time_policy - time_rollout) / shorter_stage)
+
+        pipeline_events.time_env_step(value=self._time_env_step)
+        pipeline_events.time_policy(value=self._time_policy)
+        pipeline_events.time_rollout(value=time_rollout)
+        pipeline_events.overlap(value=overlap)
+        pipeline_stats.reduce()
+
+    def _init_population(self, env_config: ConfigType, wrappers_config: CollectionOfConfigType,
+                         agent_config: ConfigType) -> Tuple[List[LogStatsWrapper], Policy]:
+        """Build the env population (including wrappers) and the shared agent.
+
+        :param env_config: Environment config.
+        :param wrappers_config: Wrapper config.
+        :param agent_config: Policies config.
+        :return: Tuple of (instantiated environments, instantiated agent).
+        """
+        envs = []
+        with SwitchWorkingDirectoryToInput(self.input_dir):
+            agent = Factory(base_type=Policy).instantiate(agent_config)
+
+            for _ in range(self.n_envs):
+                env = EnvFactory(env_config, wrappers_config)()
+                if not isinstance(env, TimeLimitWrapper):
+                    env = TimeLimitWrapper.wrap(env)
+                env.set_max_episode_steps(self.max_episode_steps)
+
+                # the episode stats of all envs are reduced to a single set of epoch stats
+                if not isinstance(env, LogStatsWrapper):
+                    env = LogStatsWrapper.wrap(env)
+                else:
+                    # a stats wrapper supplied by the wrappers config reports the epoch stats of its env under its
+                    # logging prefix, which would duplicate (and conflict with) the stats of the whole population
+                    env.get_stats(LogStatsLevel.EPOCH).consumers.clear()
+                env.get_stats(LogStatsLevel.EPISODE).register_consumer(self.epoch_stats)
+
+                if self.record_trajectory and not isinstance(env, TrajectoryRecordingWrapper):
+                    env = TrajectoryRecordingWrapper.wrap(env)
+                envs.append(env)
+
+        return envs, agent
+
+    def _run_pipeline(self, slots: List[_EnvSlot], agent: Policy) -> None:
+        """Alternately step one half of the population while computing the actions of the other half.
+
+        :param slots: The env population.
+        :param agent: The agent shared by all envs.
+        """
+        for slot in slots:
+            self._start_next_episode(slot)
+
+        halves = [slots[:len(slots) // 2], slots[len(slots) // 2:]]
+        current = 0
+        actions = self._compute_actions(halves[current], agent)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            while any(slot.active for slot in slots):
+                other = 1 - current
+                if self.overlap:
+                    pending_actions = executor.submit(self._compute_actions, halves[other], agent)
+                    self._step_envs(actions)
+                    actions = pending_actions.result()
+                else:
+                    next_actions = self._compute_actions(halves[other], agent)
+                    self._step_envs(actions)
+                    actions = next_actions
+                current = other
+
+    def _compute_actions(self, half: List[_EnvSlot], agent: Policy) -> List[Tuple[_EnvSlot, ActionType]]:
+        """Compute the actions for all active envs of the given half (executed in the inference thread).
+
+        :param half: The envs to compute the actions for.
+        :param agent: The agent to use.
+        :return: List of (env slot, action) tuples.
+        """
+        start_time = time.time()
+        actions = []
+        for slot in half:
+            if not slot.active:
+                continue
+
+            # inject the MazeEnv state if desired by the policy
+            action = agent.compute_action(observation=slot.observation,
+                                          actor_id=slot.env.actor_id(),
+                                          maze_state=slot.env.get_maze_state() if agent.needs_state() else None,
+                                          env=slot.env if agent.needs_env() else None,
+                                          deterministic=self.deterministic)
+            actions.append((slot, action))
+
+        self._time_policy += time.time() - start_time
+        return actions
+
+    def _step_envs(self, actions: List[Tuple[_EnvSlot, ActionType]]) -> None:
+        """Step the envs with the given actions, starting the next episode on envs that are done.
+
+        :param actions: List of (env slot, action) tuples.
+        """
+        start_time = time.time()
+        for slot, action in actions:
+            slot.observation, _, done, _ = slot.env.step(action)
+            if done:
+                self.progress_bar.update()
+                self._start_next_episode(slot)
+
+        self._time_env_step += time.time() - start_time
+
+    def _start_next_episode(self, slot: _EnvSlot) -> None:
+        """Seed and reset the env for the next pending episode, or deactivate it if all episodes are started.
+
+        :param slot: The env to start the episode in.
+        """
+        if self._n_episodes_started >= len(self._env_seeds):
+            slot.active = False
+            return
+
+        slot.env.seed(self._env_seeds[self._n_episodes_started])
+        try:
+            slot.observation = slot.env.reset()
+        except Exception as exception:
+            BColors.print_colored(f'A error was encountered during reset on the env_seed: '
+                                  f'{self._env_seeds[self._n_episodes_started]}', BColors.FAIL)
+            raise exception
+
+        self._n_episodes_started += 1
+        slot.active = True
@@ -0,0 +1,27 @@
+"""Tests for the batched CartPole dynamics."""
+import numpy as np
+
+from maze_cartpole.env.batched_dynamics import CartPoleBatchedDynamics
+from maze_cartpole.env.core_env import CartPoleCoreEnvironment
+from maze_cartpole.reward.default_reward import CartPoleRewardAggregator
+
+
+def test_batch_step_matches_core_env_ticks():
+    """A single batch step matches the physics tick of the core env for each state of the batch."""
+    n_states = 64
+    rng = np.random.RandomState(1234)
+    states = rng.uniform(low=[-2.0, -1.0, -0.2, -1.0], high=[2.0, 1.0, 0.2, 1.0], size=(n_states, 4))
+    forces = rng.choice([-CartPoleCoreEnvironment.FORCE_MAG, CartPoleCoreEnvironment.FORCE_MAG], size=n_states)
+
+    batch_states = np.stack(CartPoleBatchedDynamics().step(*states.T, forces), axis=1)
+
+    core_env = CartPoleCoreEnvironment(theta_threshold_radians=0.20943951, x_threshold=2.4,
+                                       reward_aggregator=CartPoleRewardAggregator())
+    for idx in range(n_states):
+        core_env.cart_position, core_env.cart_velocity, core_env.pole_angle, core_env.pole_velocity = \
+            (float(value) for value in states[idx])
+        core_env._integrate_tick(float(forces[idx]))
+
+        core_state = [core_env.cart_position, core_env.cart_velocity, core_env.pole_angle, core_env.pole_velocity]
+        # (np.cos and math.cos may differ in the last bit)
+        assert np.allclose(batch_states[idx], core_state, rtol=1e-12, atol=1e-15)
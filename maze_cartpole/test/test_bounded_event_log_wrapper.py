@@ -0,0 +1,79 @@
+"""Tests for the bounded event log wrapper."""
+from typing import Optional
+
+import pytest
+
+from maze.core.log_stats.log_stats import LogStatsLevel
+from maze.core.utils.config_utils import read_hydra_config, make_env
+from maze.core.wrappers.log_stats_wrapper import LogStatsWrapper
+from maze_cartpole.env.events import CartPoleEvents
+from maze_cartpole.wrappers.bounded_event_log_wrapper import BoundedEventLogWrapper
+
+MAX_STEP_LOGS = 5
+N_STEPS = 30
+
+
+def _build_env(step_retention: Optional[str]) -> LogStatsWrapper:
+    """Build the CartPole env, wrapped in the bounded event log wrapper (or in the default statistics wrapper if no
+    step retention is given)."""
+    cfg = read_hydra_config(config_module="maze.conf", config_name="conf_rollout", env="cartpole_env")
+    env = make_env(cfg.env, {})
+    if step_retention is None:
+        return LogStatsWrapper.wrap(env)
+
+    return BoundedEventLogWrapper.wrap(env, aggregate_only=["CartPoleEvents.cart_velocity"],
+                                       step_retention=step_retention, max_step_logs=MAX_STEP_LOGS)
+
+
+def _run_episode(step_retention: Optional[str]) -> LogStatsWrapper:
+    """Run the first N_STEPS steps of an episode in a wrapped CartPole env."""
+    env = _build_env(step_retention)
+    env.seed(1234)
+    env.reset()
+
+    for step in range(N_STEPS):
+        # alternating pushes keep the pole upright for much longer than N_STEPS
+        _, _, done, _ = env.step({"action": step % 2})
+        assert not done
+
+    return env
+
+
+@pytest.mark.parametrize("step_retention", ["all", "ring_buffer", "reservoir"])
+def test_step_retention(step_retention: str):
+    """Tests the retained step logs beyond `max_step_logs` steps."""
+    env = _run_episode(step_retention)
+    step_event_logs = list(env.episode_event_log.step_event_logs)
+    env_times = [step_event_log.env_time for step_event_log in step_event_logs]
+
+    if step_retention == "all":
+        assert len(step_event_logs) == N_STEPS
+    else:
+        assert len(step_event_logs) == MAX_STEP_LOGS
+
+    # the logs stay in chronological order and always include the most recent step
+    assert env_times == sorted(set(env_times))
+    assert env_times[-1] == env.get_env_time() - 1
+    if step_retention != "reservoir":
+        assert env_times == list(range(env_times[-1] - len(env_times) + 1, env_times[-1] + 1))
+
+    # aggregate only events are dropped from all steps (also from the steps after the ring buffer is full)
+    for step_event_log in step_event_logs:
+        assert all(event.interface_method != CartPoleEvents.cart_velocity for event in step_event_log.events)
+        assert len(list(step_event_log.events)) > 0
+
+
+@pytest.mark.parametrize("step_retention", ["all", "ring_buffer", "reservoir"])
+def test_statistics_match_default_statistics_wrapper(step_retention: str):
+    """The statistics are the same as with the default statistics wrapper, including the aggregate only events."""
+    default_env = _run_episode(step_retention=None)
+    bounded_env = _run_episode(step_retention)
+
+    for env in (default_env, bounded_env):
+        env.write_epoch_stats()
+
+    for level in (LogStatsLevel.EPISODE, LogStatsLevel.EPOCH):
+        assert bounded_env.get_stats(level).last_stats == default_env.get_stats(level).last_stats
+
+    epoch_stats = bounded_env.get_stats(LogStatsLevel.EPOCH).last_stats
+    assert (CartPoleEvents.cart_velocity, "mean_episode_total", None) in epoch_stats
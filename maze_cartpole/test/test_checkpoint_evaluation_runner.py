@@ -0,0 +1,77 @@
+"""Tests for the checkpoint evaluation runner."""
+import glob
+import json
+import os
+
+from maze.core.utils.config_utils import read_hydra_config
+from maze_cartpole.rollout.checkpoint_evaluation_runner import evaluate_checkpoint, CheckpointEvaluationRunner
+
+EVAL_SEEDS = list(range(10))
+MAX_EPISODE_STEPS = 500
+
+
+def _configs():
+    """The env and heuristic policy configurations."""
+    cfg = read_hydra_config(config_module="maze.conf", config_name="conf_rollout",
+                            env="cartpole_env", policy="cartpole_heuristic_policy")
+    return cfg.env, cfg.policy
+
+
+def test_failure_modes():
+    """The failure modes of the heuristic policy are counted from the terminal events of each episode."""
+    env, agent = _configs()
+    result = evaluate_checkpoint(checkpoint_dir=os.getcwd(), env=env, wrappers={}, agent=agent,
+                                 eval_seeds=EVAL_SEEDS, max_episode_steps=MAX_EPISODE_STEPS, deterministic=True,
+                                 n_envs=4)
+
+    episode_lengths = result["episode_lengths"]
+    failure_modes = result["failure_modes"]
+    assert len(episode_lengths) == len(EVAL_SEEDS)
+
+    # the heuristic only looks at the pole angle and fails most of the episodes
+    n_failed = sum(episode_length < MAX_EPISODE_STEPS for episode_length in episode_lengths)
+    assert n_failed > 0
+    assert failure_modes["pole_fell_over"] + failure_modes["cart_moved_away"] >= n_failed
+    assert failure_modes["survived"] == len(EVAL_SEEDS) - n_failed
+
+
+def test_population_size_does_not_change_deterministic_results():
+    """The episodes of a population stepped in lockstep match the episodes run one after another."""
+    env, agent = _configs()
+    results = [evaluate_checkpoint(checkpoint_dir=os.getcwd(), env=env, wrappers={}, agent=agent,
+                                   eval_seeds=EVAL_SEEDS, max_episode_steps=MAX_EPISODE_STEPS, deterministic=True,
+                                   n_envs=n_envs)
+               for n_envs in (1, 3, len(EVAL_SEEDS))]
+
+    for result in results[1:]:
+        assert result == results[0]
+
+
+def test_results_are_cached():
+    """Evaluations are served from the cache on the second run."""
+    env, agent = _configs()
+    runner = CheckpointEvaluationRunner(checkpoint_dirs=["."], eval_seeds=EVAL_SEEDS, n_episodes=len(EVAL_SEEDS),
+                                        max_episode_steps=MAX_EPISODE_STEPS, deterministic=True, n_processes=1,
+                                        n_envs=4, cache_dir="cache", results_file="results.json")
+
+    results = runner.evaluate(env=env, wrappers={}, agent=agent, checkpoint_dirs=runner.checkpoint_dirs)
+    assert "error" not in results[runner.checkpoint_dirs[0]]
+
+    cache_files = glob.glob("cache/*.json")
+    assert len(cache_files) == 1
+
+    # tamper with the cache entry to detect that it is used
+    with open(cache_files[0]) as in_file:
+        cached = json.load(in_file)
+    cached["mean_episode_length"] = -1
+    with open(cache_files[0], "w") as out_file:
+        json.dump(cached, out_file)
+
+    results = runner.evaluate(env=env, wrappers={}, agent=agent, checkpoint_dirs=runner.checkpoint_dirs)
+    assert results[runner.checkpoint_dirs[0]]["mean_episode_length"] == -1
+
+    # a different seed set is evaluated anew
+    runner.eval_seeds = EVAL_SEEDS[:5]
+    results = runner.evaluate(env=env, wrappers={}, agent=agent, checkpoint_dirs=runner.checkpoint_dirs)
+    assert len(results[runner.checkpoint_dirs[0]]["episode_lengths"]) == 5
+    assert len(glob.glob("cache/*.json")) == 2
@@ -0,0 +1,87 @@
+"""Tests for the CartPole core env."""
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from maze.core.env.maze_env import MazeEnv
+from maze.core.utils.config_utils import read_hydra_config, make_env
+from maze_cartpole.env.events import CartPoleEvents
+from maze_cartpole.env.maze_state import CartPoleMazeState
+
+
+def _build_env(action_repeat: int = 1, precision: str = "float64") -> MazeEnv:
+    """Build the CartPole env from the default configuration."""
+    cfg = read_hydra_config(config_module="maze.conf", config_name="conf_rollout", env="cartpole_env")
+    cfg.env.core_env.action_repeat = action_repeat
+    cfg.env.core_env.precision = precision
+    return make_env(cfg.env, {})
+
+
+def _run_episode(env: MazeEnv, seed: int) -> Tuple[CartPoleMazeState, List[float]]:
+    """Push the cart to the right until the episode ends.
+
+    :return: Tuple of (final maze state, rewards of all steps).
+    """
+    env.seed(seed)
+    env.reset()
+
+    rewards = []
+    done = False
+    while not done:
+        _, reward, done, _ = env.step({"action": 1})
+        rewards.append(reward)
+
+    return env.get_maze_state(), rewards
+
+
+@pytest.mark.parametrize("action_repeat", [2, 3, 4])
+def test_action_repeat_matches_single_ticks(action_repeat: int):
+    """A step with action repeat k matches k single tick steps, including the tick the episode terminates at."""
+    single_env, repeat_env = _build_env(), _build_env(action_repeat=action_repeat)
+    single_state, single_rewards = _run_episode(single_env, seed=1234)
+    repeat_state, repeat_rewards = _run_episode(repeat_env, seed=1234)
+
+    assert repeat_state.__dict__ == single_state.__dict__
+    assert sum(repeat_rewards) == sum(single_rewards)
+
+    # the episode terminates within the step containing the terminal tick
+    assert len(repeat_rewards) == -(-len(single_rewards) // action_repeat)
+
+    # the KPIs are accumulated per tick
+    assert repeat_env.get_kpi_calculator().calculate_kpis(None, repeat_state) == \
+           single_env.get_kpi_calculator().calculate_kpis(None, single_state)
+
+
+def test_float32_precision_keeps_state_in_float32():
+    """The float32 dynamics do not promote the state to float64 during integration."""
+    env = _build_env(precision="float32")
+    env.seed(1234)
+    env.reset()
+
+    for step in range(10):
+        env.step({"action": step % 2})
+
+    maze_state = env.get_maze_state()
+    for value in (maze_state.cart_position, maze_state.cart_velocity, maze_state.pole_angle,
+                  maze_state.pole_angular_velocity):
+        assert type(value) == np.float32
+
+
+def test_action_repeat_emits_single_aggregate_event():
+    """A step with action repeat k emits a single cart velocity event, holding the sum over the k ticks."""
+    single_env, repeat_env = _build_env(), _build_env(action_repeat=4)
+    for env in (single_env, repeat_env):
+        env.seed(1234)
+        env.reset()
+
+    single_velocities = []
+    for _ in range(4):
+        single_env.step({"action": 1})
+        single_velocities.append(single_env.get_maze_state().cart_velocity)
+
+    repeat_env.step({"action": 1})
+    velocity_events = [event for event in repeat_env.get_step_events()
+                       if event.interface_method == CartPoleEvents.cart_velocity]
+    assert len(velocity_events) == 1
+    assert velocity_events[0].attributes["velocity"] == sum(single_velocities)
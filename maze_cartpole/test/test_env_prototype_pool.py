@@ -0,0 +1,64 @@
+"""Tests for the env prototype pool."""
+import numpy as np
+
+from maze.core.log_stats.log_stats import LogStatsLevel
+from maze.core.utils.config_utils import read_hydra_config, EnvFactory
+from maze.core.wrappers.log_stats_wrapper import LogStatsWrapper
+from maze_cartpole.utils.env_prototype_pool import EnvPrototypePool
+from maze_cartpole.utils.events import EnvPoolEvents
+
+WRAPPERS = {"maze.core.wrappers.log_stats_wrapper.LogStatsWrapper": {"logging_prefix": None}}
+
+
+def _env_config():
+    """The default CartPole env configuration."""
+    return read_hydra_config(config_module="maze.conf", config_name="conf_rollout", env="cartpole_env").env
+
+
+def test_pool_envs_match_factory_envs():
+    """Envs created by the pool behave exactly as the envs instantiated from the configuration."""
+    pool = EnvPrototypePool(env=_env_config(), wrappers=WRAPPERS)
+
+    for seed in (1234, 2345):
+        pool_env = pool.create(seed=seed)
+        factory_env = EnvFactory(_env_config(), WRAPPERS)()
+        factory_env.seed(seed)
+        assert isinstance(pool_env, LogStatsWrapper) and isinstance(factory_env, LogStatsWrapper)
+
+        pool_obs, factory_obs = pool_env.reset(), factory_env.reset()
+        for step in range(50):
+            for key in factory_obs:
+                assert np.array_equal(pool_obs[key], factory_obs[key])
+
+            action = {"action": int(factory_obs["pole_angle"] > 0)}
+            pool_obs, pool_reward, pool_done, _ = pool_env.step(action)
+            factory_obs, factory_reward, factory_done, _ = factory_env.step(action)
+            assert pool_reward == factory_reward and pool_done == factory_done
+            if factory_done:
+                break
+
+
+def test_acquire_recycles_released_envs():
+    """Released envs are reset, cleared and handed out again, which is reported in the stats."""
+    pool = EnvPrototypePool(env=_env_config(), wrappers=WRAPPERS, max_pool_size=1)
+
+    # the validation instance is handed out first, further envs are created
+    first_env = pool.acquire(seed=1234)
+    second_env = pool.acquire(seed=2345)
+    assert first_env is not second_env
+
+    first_env.reset()
+    for _ in range(5):
+        first_env.step({"action": 1})
+    pool.release(first_env)
+    assert not first_env.episode_event_log
+    assert len(first_env.get_stats(LogStatsLevel.EPOCH).input) == 0
+
+    # envs beyond the maximum pool size are closed instead of recycled
+    pool.release(second_env)
+    assert pool.acquire(seed=3456) is first_env
+    assert pool.acquire(seed=4567) is not second_env
+
+    stats = pool.write_stats()
+    assert stats[(EnvPoolEvents.env_created, "count", None)] == 3
+    assert stats[(EnvPoolEvents.env_recycled, "count", None)] == 2
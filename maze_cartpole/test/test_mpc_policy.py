@@ -0,0 +1,49 @@
+"""Tests for the MPC policy."""
+from typing import Callable
+
+from maze.core.env.maze_env import MazeEnv
+from maze.core.utils.config_utils import read_hydra_config, make_env
+from maze_cartpole.env.maze_state import CartPoleMazeState
+from maze_cartpole.policies.heuristic_policy import CartPoleDummyHeuristic
+from maze_cartpole.policies.mpc_policy import CartPoleMPCPolicy
+
+# thresholds tight enough for the heuristic policy to fail right away
+THETA_THRESHOLD_RADIANS = 0.052
+X_THRESHOLD = 0.5
+MAX_EPISODE_STEPS = 500
+
+
+def _build_env() -> MazeEnv:
+    """Build the CartPole env with the tight thresholds."""
+    cfg = read_hydra_config(config_module="maze.conf", config_name="conf_rollout", env="cartpole_env")
+    cfg.env._.theta_threshold_radians = THETA_THRESHOLD_RADIANS
+    cfg.env._.x_threshold = X_THRESHOLD
+    return make_env(cfg.env, {})
+
+
+def _episode_length(env: MazeEnv, compute_action: Callable[[dict, CartPoleMazeState], dict], seed: int) -> int:
+    """Run a single episode with the given action function (of observation and maze state)."""
+    env.seed(seed)
+    obs = env.reset()
+    for step in range(MAX_EPISODE_STEPS):
+        obs, _, done, _ = env.step(compute_action(obs, env.get_maze_state()))
+        if done:
+            return step + 1
+
+    return MAX_EPISODE_STEPS
+
+
+def test_mpc_survives_where_heuristic_fails():
+    """With tight thresholds, the heuristic policy fails within a few steps, while the MPC policy keeps the pole up."""
+    env = _build_env()
+    heuristic_policy = CartPoleDummyHeuristic()
+    mpc_policy = CartPoleMPCPolicy(theta_threshold_radians=THETA_THRESHOLD_RADIANS, x_threshold=X_THRESHOLD)
+
+    for seed in range(3):
+        heuristic_length = _episode_length(
+            env, lambda obs, maze_state: heuristic_policy.compute_action(obs, maze_state=maze_state), seed=seed)
+        mpc_length = _episode_length(
+            env, lambda obs, maze_state: mpc_policy.compute_action(obs, maze_state=maze_state), seed=seed)
+
+        assert heuristic_length < 20
+        assert mpc_length >= 200
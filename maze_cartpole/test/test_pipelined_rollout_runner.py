@@ -0,0 +1,96 @@
+"""Tests for the pipelined rollout runner."""
+from typing import Any, Dict, Tuple
+
+from maze.core.env.maze_env import MazeEnv
+from maze.core.rollout.rollout_runner import RolloutRunner
+from maze.core.rollout.sequential_rollout_runner import SequentialRolloutRunner
+from maze.core.utils.config_utils import read_hydra_config
+from maze.core.utils.seeding import MazeSeeding
+from maze.core.wrappers.wrapper import Wrapper
+from maze.utils.log_stats_utils import clear_global_state
+from maze_cartpole.rollout.pipelined_rollout_runner import PipelinedRolloutRunner
+
+ENV_SEEDS = list(range(1000, 1012))
+
+
+class _EpisodeRecordingWrapper(Wrapper[MazeEnv]):
+    """Records the length and the reward of each episode by env seed."""
+
+    def __init__(self, env: MazeEnv, episodes: Dict[Any, Tuple[int, float]]):
+        super().__init__(env)
+        self.episodes = episodes
+        self.env_seed = None
+        self.episode_length = 0
+        self.episode_reward = 0.0
+
+    def seed(self, seed: Any) -> None:
+        """Remember the seed of the next episode."""
+        self.env_seed = seed
+        self.env.seed(seed)
+
+    def reset(self) -> Any:
+        """Start recording a new episode."""
+        self.episode_length = 0
+        self.episode_reward = 0.0
+        return self.env.reset()
+
+    def step(self, action: Any) -> Tuple[Any, Any, bool, Dict[Any, Any]]:
+        """Record the step (the outer time limit might end the episode without this wrapper noticing)."""
+        obs, reward, done, info = self.env.step(action)
+        self.episode_length += 1
+        self.episode_reward += reward
+        self.episodes[self.env_seed] = (self.episode_length, self.episode_reward)
+        return obs, reward, done, info
+
+    def clone_from(self, env: MazeEnv) -> None:
+        """Not supported."""
+        raise NotImplementedError
+
+    def get_observation_and_action_dicts(self, maze_state, maze_action, first_step_in_episode):
+        """Keep both actions and observation the same."""
+        return self.env.get_observation_and_action_dicts(maze_state, maze_action, first_step_in_episode)
+
+
+def _run(runner: RolloutRunner, policy: str = "cartpole_heuristic_policy") -> Dict[Any, Tuple[int, float]]:
+    """Run the given policy with the given runner, returning the recorded episodes by env seed."""
+    clear_global_state()
+    cfg = read_hydra_config(config_module="maze.conf", config_name="conf_rollout",
+                            env="cartpole_env", policy=policy)
+
+    runner.maze_seeding = MazeSeeding(env_seed=1234, agent_seed=1234, cudnn_determinism_flag=False,
+                                      explicit_env_seeds=ENV_SEEDS, explicit_agent_seeds=ENV_SEEDS,
+                                      shuffle_seeds=False)
+
+    episodes = dict()
+    runner.run_with(env=cfg.env, wrappers={_EpisodeRecordingWrapper: {"episodes": episodes}},
+                    agent=cfg.policy)
+    return episodes
+
+
+def test_pipelined_rollouts_match_sequential_rollouts():
+    """The same seeds produce the same episodes with and without overlap, and with the sequential runner."""
+    sequential = _run(SequentialRolloutRunner(n_episodes=len(ENV_SEEDS), max_episode_steps=500, deterministic=True,
+                                              record_trajectory=False, record_event_logs=False, render=False))
+    assert sorted(sequential.keys()) == ENV_SEEDS
+
+    for overlap in (True, False):
+        pipelined = _run(PipelinedRolloutRunner(n_episodes=len(ENV_SEEDS), max_episode_steps=500,
+                                                deterministic=True, record_trajectory=False,
+                                                record_event_logs=False, n_envs=4, overlap=overlap))
+        assert pipelined == sequential
+
+
+
+def test_stochastic_pipelined_rollouts_are_reproducible(capsys):
+    """With stochastic sampling, the rollouts are the same with and without overlap (but a warning is issued,
+    as the episodes differ from those of the sequential runner)."""
+    rollouts = []
+    for overlap in (True, False):
+        rollouts.append(_run(PipelinedRolloutRunner(n_episodes=len(ENV_SEEDS), max_episode_steps=500,
+                                                    deterministic=False, record_trajectory=False,
+                                                    record_event_logs=False, n_envs=4, overlap=overlap),
+                             policy="random_policy"))
+
+    assert sorted(rollouts[0].keys()) == ENV_SEEDS
+    assert rollouts[0] == rollouts[1]
+    assert "Stochastic action sampling" in capsys.readouterr().out
@@ -0,0 +1,13 @@
+"""Tests for the float32/float64 precision drift report."""
+from maze_cartpole.utils.precision_drift_report import compute_precision_drift, STATE_ATTRIBUTES
+
+
+def test_precision_drift_over_few_seeds(capsys):
+    """The paired rollouts of a few seeds stay in lockstep, without warnings about stepping terminated envs."""
+    report = compute_precision_drift(n_seeds=5, max_steps=500)
+
+    assert "You are calling 'step()'" not in capsys.readouterr().out
+    assert report["fraction_equal_episode_length"] == 1.0
+    assert report["mean_episode_length_float64"] == report["mean_episode_length_float32"]
+    for attribute in STATE_ATTRIBUTES:
+        assert report[f"max_abs_{attribute}_diff"] < 1e-3
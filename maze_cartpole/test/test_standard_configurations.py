@@ -22,6 +22,20 @@ configurations = [
     ["conf_rollout", {"policy": "cartpole_heuristic_policy", "env": "cartpole_env"}],
     ["conf_rollout", {"policy": "cartpole_heuristic_policy", "runner": "sequential",
                       "runner.render": True, "runner.n_episodes": 1, "env": "cartpole_env"}],
+    ["conf_rollout", {"policy": "cartpole_heuristic_policy", "runner": "pipelined", "env": "cartpole_env"}],
+    ["conf_rollout", {"policy": "cartpole_heuristic_policy", "runner": "pipelined", "runner.overlap": False,
+                      "env": "cartpole_env"}],
+    ["conf_rollout", {"policy": "cartpole_heuristic_policy", "runner": "sequential",
+                      "wrappers": "cartpole_bounded_event_log", "env": "cartpole_env"}],
+    ["conf_rollout", {"policy": "cartpole_heuristic_policy", "runner": "sequential",
+                      "env.core_env.action_repeat": 4, "env": "cartpole_env"}],
+    ["conf_rollout", {"policy": "cartpole_heuristic_policy", "runner": "sequential",
+                      "env.core_env.precision": "float32", "env": "cartpole_env"}],
+    ["conf_rollout", {"policy": "cartpole_mpc_policy", "runner": "sequential", "runner.n_episodes": 2,
+                      "runner.max_episode_steps": 200, "env": "cartpole_env"}],
+    ["conf_rollout", {"policy": "cartpole_heuristic_policy", "runner": "checkpoint_evaluation",
+                      "runner.checkpoint_dirs": "[.]", "runner.n_episodes": 2, "runner.n_processes": 1,
+                      "env": "cartpole_env"}],
 
     ["conf_train", {"+experiment": "cartpole_hard_ppo"}],
 ]
@@ -0,0 +1,50 @@
+"""Tests for the tiled renderer."""
+import numpy as np
+
+from maze_cartpole.env.maze_state import CartPoleMazeState
+from maze_cartpole.env.tiled_renderer import CartPoleTiledRenderer
+
+
+def _cart_color_at(renderer: CartPoleTiledRenderer, image: np.ndarray, states: np.ndarray, env_idx: int) -> np.ndarray:
+    """Color of the image within the cart of the given env (left of the pole and above the wheels)."""
+    width = renderer.n_columns * renderer.TILE_WIDTH
+    height = renderer.n_rows * renderer.TILE_HEIGHT
+    origin = renderer.tile_origins[env_idx]
+
+    x = origin[0] + renderer.TILE_WIDTH / 2.0 + states[env_idx, 0] * renderer.scale - 0.4 * renderer.CART_WIDTH
+    y = origin[1] + renderer.CART_Y + renderer.WHEEL_RADIUS + 0.3 * renderer.CART_HEIGHT
+
+    row = int((1.0 - y / height) * image.shape[0])
+    column = int(x / width * image.shape[1])
+    return image[row, column].astype(np.float64) / 255
+
+
+def test_render_population():
+    """Renders 64 stacked states with labels and dones."""
+    n_envs = 64
+    rng = np.random.RandomState(1234)
+    maze_states = [CartPoleMazeState(cart_position=rng.uniform(-2.0, 2.0), cart_velocity=rng.uniform(-1, 1),
+                                     pole_angle=rng.uniform(-0.2, 0.2), pole_angular_velocity=rng.uniform(-1, 1))
+                   for _ in range(n_envs)]
+    states = CartPoleTiledRenderer.stack_states(maze_states)
+    assert states.shape == (n_envs, 4)
+
+    dones = np.arange(n_envs) % 3 == 0
+    labels = [f"step {idx}" for idx in range(n_envs)]
+
+    renderer = CartPoleTiledRenderer(n_envs=n_envs, dpi=144)
+    image = renderer.render(states, labels=labels, dones=dones)
+
+    assert image.dtype == np.uint8
+    assert image.shape == (renderer.n_rows * 144 * 4 // 3, renderer.n_columns * 144 * 2, 3)
+    assert (renderer.n_rows, renderer.n_columns) == (8, 8)
+
+    for env_idx in range(n_envs):
+        expected_color = renderer.DONE_CART_COLOR if dones[env_idx] else renderer.CART_COLOR
+        assert np.allclose(renderer.carts.get_facecolors()[env_idx], expected_color)
+        assert np.allclose(_cart_color_at(renderer, image, states, env_idx), expected_color[:3], atol=0.02)
+
+    # rendering the next frame reuses the artists
+    next_image = renderer.render(states, labels=labels, dones=np.zeros(n_envs, dtype=bool))
+    assert next_image.shape == image.shape
+    assert np.allclose(_cart_color_at(renderer, next_image, states, 0), renderer.CART_COLOR[:3], atol=0.02)
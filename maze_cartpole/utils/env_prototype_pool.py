@@ -0,0 +1,158 @@
+"""Contains a pool creating and recycling env instances from a once compiled env configuration."""
+import time
+from typing import Any, Callable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from omegaconf import DictConfig, ListConfig, OmegaConf
+
+from maze.core.env.maze_env import MazeEnv
+from maze.core.log_stats.log_stats import LogStatsAggregator, LogStatsLevel, get_stats_logger, LogStats
+from maze.core.log_stats.log_stats_env import LogStatsEnv
+from maze.core.utils.factory import ConfigType, CollectionOfConfigType, Factory
+from maze.core.wrappers.wrapper import Wrapper
+from maze_cartpole.utils.events import EnvPoolEvents
+
+# keys of the config dictionaries, which are not passed on to the constructors
+RESERVED_KEYS = ("_target_", "_recursive_", "_")
+
+
+class EnvPrototypePool:
+    """Creates env instances from a prototype compiled once from the env (and wrappers) configuration.
+
+    On construction, the configuration is resolved (i.e., all interpolations are evaluated) and compiled into
+    a tree of constructor calls, with all `_target_` classes imported up front. New instances are created by
+    calling the constructors directly, bypassing Hydra's instantiation and the per component factory lookups.
+    Nested components are passed on to their parents as already instantiated objects, which all Maze components
+    accept in place of a configuration.
+
+    The configuration is validated by creating a first instance right away, which is put into the pool.
+    Envs handed back via :meth:`release` are reset (which ends their episode, hence the statistics and event log of
+    the episode are flushed) and their epoch statistics are cleared, so recycled envs do not carry over any state of
+    their previous use. Envs handed out by :meth:`acquire` still require a reset by the caller (as after every
+    seeding).
+
+    Creation latency is collected in the `env_pool` statistics, see :meth:`write_stats`.
+
+    :param env: The env configuration.
+    :param wrappers: The wrappers configuration.
+    :param max_pool_size: Maximum number of released envs kept for recycling (envs beyond are closed).
+    """
+
+    def __init__(self, env: ConfigType, wrappers: Optional[CollectionOfConfigType] = None, max_pool_size: int = 64):
+        self.max_pool_size = max_pool_size
+
+        self.stats = LogStatsAggregator(LogStatsLevel.EPOCH, get_stats_logger("env_pool"))
+        self.events = self.stats.create_event_topic(EnvPoolEvents)
+
+        self._build_env = self._compile(self._to_container(env))
+        self._wrappers = self._compile_wrappers(self._to_container(wrappers) if wrappers else {})
+        self._pool: List[MazeEnv] = []
+
+        # validate the configuration
+        self._pool.append(self.create(seed=None))
+
+    def create(self, seed: Optional[Any] = None) -> MazeEnv:
+        """Create a new env instance from the prototype.
+
+        :param seed: Optional seed for the new env.
+        :return: The newly created env (to be reset before use).
+        """
+        start_time = time.time()
+
+        env = self._build_env()
+        for wrapper_type, build_kwargs in self._wrappers:
+            env = wrapper_type.wrap(env, **build_kwargs())
+        if seed is not None:
+            env.seed(seed)
+
+        self.events.env_created(value=time.time() - start_time)
+        return env
+
+    def acquire(self, seed: Optional[Any] = None) -> MazeEnv:
+        """Hand out a recycled env if available, otherwise create a new one.
+
+        :param seed: Optional seed for the env.
+        :return: The env (to be reset before use).
+        """
+        if not self._pool:
+            return self.create(seed)
+
+        start_time = time.time()
+        env = self._pool.pop()
+        if seed is not None:
+            env.seed(seed)
+
+        self.events.env_recycled(value=time.time() - start_time)
+        return env
+
+    def release(self, env: MazeEnv) -> None:
+        """Hand back an env that is no longer in use, for it to be recycled (after a reset).
+
+        :param env: An env previously obtained from this pool.
+        """
+        if len(self._pool) >= self.max_pool_size:
+            env.close()
+            return
+
+        env.reset()
+        if isinstance(env, LogStatsEnv):
+            env.clear_epoch_stats()
+
+        self._pool.append(env)
+
+    def write_stats(self) -> Optional[LogStats]:
+        """Reduce and log the creation latency statistics collected since the last call.
+
+        As for all epoch statistics, this can be called at most once per global log step (and happens automatically
+        on incrementing the log step).
+
+        :return: The statistics (None if no env was handed out).
+        """
+        if len(self.stats.input) == 0:
+            return None
+
+        return self.stats.reduce()
+
+    def close(self) -> None:
+        """Close all pooled envs."""
+        for env in self._pool:
+            env.close()
+        self._pool = []
+
+    @staticmethod
+    def _to_container(config: Union[ConfigType, CollectionOfConfigType]) -> Any:
+        """Convert Hydra configs into plain Python containers with all interpolations resolved."""
+        if isinstance(config, (DictConfig, ListConfig)):
+            return OmegaConf.to_container(config, resolve=True)
+        return config
+
+    @classmethod
+    def _compile(cls, config: Any) -> Callable[[], Any]:
+        """Compile a (plain) configuration into a function building the configured object.
+
+        :param config: The configuration (or an arbitrary value).
+        :return: A function returning a newly built object on each call.
+        """
+        if isinstance(config, Mapping) and "_target_" in config:
+            target = Factory(Callable).type_from_name(config["_target_"])
+            build_kwargs = cls._compile({key: value for key, value in config.items() if key not in RESERVED_KEYS})
+            return lambda: target(**build_kwargs())
+
+        if isinstance(config, Mapping):
+            builders = [(key, cls._compile(value)) for key, value in config.items()]
+            return lambda: {key: build() for key, build in builders}
+
+        if isinstance(config, Sequence) and not isinstance(config, str):
+            builders = [cls._compile(value) for value in config]
+            return lambda: [build() for build in builders]
+
+        return lambda: config
+
+    @classmethod
+    def _compile_wrappers(cls, config: CollectionOfConfigType) -> List[Tuple[type, Callable[[], dict]]]:
+        """Compile the wrappers configuration (see :class:`~maze.core.wrappers.wrapper_factory.WrapperFactory`).
+
+        :param config: The wrappers configuration, mapping wrapper types to their arguments.
+        :return: List of tuples (wrapper type, function building the wrapper arguments).
+        """
+        return [(Factory(Wrapper).type_from_name(wrapper_type), cls._compile(kwargs if kwargs else {}))
+                for wrapper_type, kwargs in config.items()]
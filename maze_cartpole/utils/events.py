@@ -0,0 +1,21 @@
+"""Contains the statistics events emitted by the project specific utilities."""
+from abc import ABC
+
+import numpy as np
+from maze.core.log_stats.event_decorators import define_epoch_stats
+
+
+class EnvPoolEvents(ABC):
+    """Event interface, defining the statistics emitted by the EnvPrototypePool."""
+
+    @define_epoch_stats(np.mean, output_name="mean")
+    @define_epoch_stats(np.max, output_name="max")
+    @define_epoch_stats(len, output_name="count")
+    def env_created(self, value: float):
+        """Time required to create a new env instance from the prototype."""
+
+    @define_epoch_stats(np.mean, output_name="mean")
+    @define_epoch_stats(np.max, output_name="max")
+    @define_epoch_stats(len, output_name="count")
+    def env_recycled(self, value: float):
+        """Time required to hand out a recycled env instance (including seeding)."""
@@ -0,0 +1,135 @@
+"""Compares float32 and float64 CartPole dynamics by running paired rollouts over many seeds.
+
+Run with: python -m maze_cartpole.utils.precision_drift_report --n_seeds 1000
+"""
+import argparse
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from maze_cartpole.env.core_env import CartPoleCoreEnvironment
+from maze_cartpole.env.maze_state import CartPoleMazeState
+from maze_cartpole.policies.heuristic_policy import CartPoleDummyHeuristic
+from maze_cartpole.reward.default_reward import CartPoleRewardAggregator
+from maze_cartpole.space_interfaces.dict_action_conversion import DictActionConversion
+from maze_cartpole.space_interfaces.dict_observation_conversion import DictObservationConversion
+
+STATE_ATTRIBUTES = ("cart_position", "cart_velocity", "pole_angle", "pole_angular_velocity")
+
+
+def _state_to_array(maze_state: CartPoleMazeState) -> np.ndarray:
+    """Stack the state variables in float64 (in the order of `STATE_ATTRIBUTES`)."""
+    return np.array([getattr(maze_state, attribute) for attribute in STATE_ATTRIBUTES], dtype=np.float64)
+
+
+def run_paired_rollout(envs: List[CartPoleCoreEnvironment], observation_conversion: DictObservationConversion,
+                       seed: int, max_steps: int) -> Tuple[int, int, np.ndarray]:
+    """Run a float64 and a float32 env from the same seed, each one acting on its own state (closed loop, using the
+    heuristic policy on the float32 observations).
+
+    :param envs: The float64 and the float32 env (in this order).
+    :param observation_conversion: The observation conversion passing the state to the policy.
+    :param seed: The env seed (both envs start from the same initial state).
+    :param max_steps: Maximum number of steps per episode.
+    :return: Tuple of (float64 episode length, float32 episode length,
+             max absolute state deviation per state variable over the steps both envs were alive).
+    """
+    policy = CartPoleDummyHeuristic()
+    action_conversion = DictActionConversion()
+
+    # the core envs are stepped without the wrapper stack, hence the events are cleared here as done by the MazeEnv
+    # (on reset) and the outermost wrapper (after each step)
+    maze_states = []
+    for env in envs:
+        env.seed(seed)
+        env.context.reset_env_episode()
+        maze_states.append(env.reset())
+
+    episode_lengths = [max_steps] * len(envs)
+    max_deviation = np.abs(_state_to_array(maze_states[0]) - _state_to_array(maze_states[1]))
+    for step in range(max_steps):
+        dones = []
+        for idx, env in enumerate(envs):
+            if episode_lengths[idx] < max_steps:
+                continue
+
+            action = policy.compute_action(observation_conversion.maze_to_space(maze_states[idx]))
+            maze_states[idx], _, done, _ = env.step(action_conversion.space_to_maze(action, maze_states[idx]))
+            env.context.event_service.clear_events()
+            if done:
+                episode_lengths[idx] = step + 1
+            dones.append(done)
+
+        # compare the states only as long as both envs are alive
+        if len(dones) == len(envs):
+            deviation = np.abs(_state_to_array(maze_states[0]) - _state_to_array(maze_states[1]))
+            max_deviation = np.maximum(max_deviation, deviation)
+
+        if all(length < max_steps for length in episode_lengths):
+            break
+
+    return episode_lengths[0], episode_lengths[1], max_deviation
+
+
+def compute_precision_drift(n_seeds: int, max_steps: int, theta_threshold_radians: float = 0.20943951,
+                            x_threshold: float = 2.4) -> Dict[str, float]:
+    """Run paired float32/float64 rollouts over the seeds 0, ..., n_seeds - 1 and summarize the divergence.
+
+    :param n_seeds: Number of seeds (i.e., pairs of episodes) to run.
+    :param max_steps: Maximum number of steps per episode.
+    :param theta_threshold_radians: Angle at which to fail an episode.
+    :param x_threshold: Position at which to fail an episode.
+    :return: Dictionary of summary statistics.
+    """
+    envs = [CartPoleCoreEnvironment(theta_threshold_radians=theta_threshold_radians, x_threshold=x_threshold,
+                                    reward_aggregator=CartPoleRewardAggregator(), precision=precision)
+            for precision in CartPoleCoreEnvironment.PRECISION_OPTIONS]
+    observation_conversion = DictObservationConversion(x_threshold=x_threshold,
+                                                       theta_threshold_radians=theta_threshold_radians)
+
+    lengths_float64: List[int] = []
+    lengths_float32: List[int] = []
+    max_deviations: List[np.ndarray] = []
+    for seed in range(n_seeds):
+        length_float64, length_float32, max_deviation = run_paired_rollout(
+            envs=envs, observation_conversion=observation_conversion, seed=seed, max_steps=max_steps)
+        lengths_float64.append(length_float64)
+        lengths_float32.append(length_float32)
+        max_deviations.append(max_deviation)
+
+    length_diffs = np.abs(np.asarray(lengths_float64) - np.asarray(lengths_float32))
+    max_deviations = np.stack(max_deviations)
+
+    report = {
+        "mean_episode_length_float64": float(np.mean(lengths_float64)),
+        "mean_episode_length_float32": float(np.mean(lengths_float32)),
+        "fraction_equal_episode_length": float(np.mean(length_diffs == 0)),
+        "mean_abs_episode_length_diff": float(np.mean(length_diffs)),
+        "max_abs_episode_length_diff": float(np.max(length_diffs)),
+    }
+    for idx, attribute in enumerate(STATE_ATTRIBUTES):
+        report[f"median_max_abs_{attribute}_diff"] = float(np.median(max_deviations[:, idx]))
+        report[f"max_abs_{attribute}_diff"] = float(np.max(max_deviations[:, idx]))
+
+    return report
+
+
+def main() -> None:
+    """Parse the command line arguments and print the drift report."""
+    parser = argparse.ArgumentParser(description="Compare float32 and float64 CartPole dynamics.")
+    parser.add_argument("--n_seeds", type=int, default=1000, help="Number of paired episodes to run.")
+    parser.add_argument("--max_steps", type=int, default=500, help="Maximum number of steps per episode.")
+    parser.add_argument("--theta_threshold_radians", type=float, default=0.20943951,
+                        help="Angle at which to fail an episode.")
+    parser.add_argument("--x_threshold", type=float, default=2.4, help="Position at which to fail an episode.")
+    args = parser.parse_args()
+
+    report = compute_precision_drift(n_seeds=args.n_seeds, max_steps=args.max_steps,
+                                     theta_threshold_radians=args.theta_threshold_radians,
+                                     x_threshold=args.x_threshold)
+    for name, value in report.items():
+        print(f"{name:<45}{value:.6g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Contains a statistics logging wrapper keeping the episode event log bounded in memory."""
+from collections import deque
+from typing import Optional, List, Any, Union, TypeVar
+
+import numpy as np
+
+from maze.core.annotations import override
+from maze.core.env.base_env import BaseEnv
+from maze.core.env.maze_env import MazeEnv
+from maze.core.events.event_collection import EventCollection
+from maze.core.log_events.episode_event_log import EpisodeEventLog
+from maze.core.log_events.step_event_log import StepEventLog
+from maze.core.log_stats.log_stats_env import LogStatsEnv
+from maze.core.wrappers.log_stats_wrapper import LogStatsWrapper
+
+
+class BoundedEventLogWrapper(LogStatsWrapper):
+    """A statistics logging wrapper bounding the memory consumed by the episode event log.
+
+    Events are passed to the statistics aggregators before the retention policy is applied, hence all statistics
+    (as declared via the event decorators) stay exact. The retention policy only affects the raw event log
+    (i.e., the event log writers and the KPI calculation, see
+    :class:`~maze_cartpole.env.kpi_calculator.CartPoleKpiCalculator` for KPIs independent of the event log).
+
+    Step retention options:
+
+    * `all`: Keep the logs of all steps of the episode (default Maze behaviour).
+    * `ring_buffer`: Keep the logs of the last `max_step_logs` steps only.
+    * `reservoir`: Keep the log of the last step plus a uniform sample of `max_step_logs - 1` of the previous steps
+      (in chronological order). The sampling is seeded together with the env.
+
+    As the runners only add a LogStatsWrapper if none is present yet, this wrapper replaces the default
+    statistics wrapper when listed in the wrappers config.
+
+    :param env: The environment to wrap.
+    :param logging_prefix: The episode statistics is connected to the logging system with this tagging prefix.
+                           If None, no logging happens.
+    :param aggregate_only: Events which contribute to the statistics only, but are not kept in the event log
+                           (specified by their qualified name, e.g. `CartPoleEvents.cart_velocity`).
+    :param step_retention: One of `all`, `ring_buffer` or `reservoir`.
+    :param max_step_logs: Number of step logs retained per episode (ignored if `step_retention` is `all`).
+    """
+
+    STEP_RETENTION_OPTIONS = ("all", "ring_buffer", "reservoir")
+
+    def __init__(self, env: MazeEnv, logging_prefix: Optional[str] = None,
+                 aggregate_only: Optional[List[str]] = None, step_retention: str = "all", max_step_logs: int = 1000):
+        """Avoid calling this constructor directly, use :method:`wrap` instead."""
+        assert step_retention in self.STEP_RETENTION_OPTIONS, \
+            f"unknown step retention '{step_retention}', expected one of {self.STEP_RETENTION_OPTIONS}"
+        assert step_retention == "all" or max_step_logs >= 1, "at least one step log has to be retained"
+
+        # all attributes have to be set before initializing the parent (assignments are forwarded to the wrapped
+        # env once the wrapper is initialized, and the parent already registers the stats recording callback)
+        self.aggregate_only = set(aggregate_only) if aggregate_only else set()
+        self.step_retention = step_retention
+        self.max_step_logs = max_step_logs
+
+        self.sampling_rng = np.random.RandomState(None)
+        self._retained_event_log: Optional[EpisodeEventLog] = None
+        self._n_step_logs_seen = 0
+
+        super().__init__(env, logging_prefix)
+
+    T = TypeVar("T")
+
+    @classmethod
+    def wrap(cls, env: T, logging_prefix: Optional[str] = None, aggregate_only: Optional[List[str]] = None,
+             step_retention: str = "all", max_step_logs: int = 1000) -> Union[T, LogStatsEnv]:
+        """Creation method providing appropriate type hints. Preferred method to construct the wrapper
+        compared to calling the class constructor directly.
+
+        :param env: The environment to be wrapped.
+        :param logging_prefix: The episode statistics is connected to the logging system with this tagging
+                               prefix. If None, no logging happens.
+        :param aggregate_only: Events which are not kept in the event log (by qualified name).
+        :param step_retention: One of `all`, `ring_buffer` or `reservoir`.
+        :param max_step_logs: Number of step logs retained per episode.
+
+        :return A newly created wrapper instance.
+        """
+        instance = cls(env, logging_prefix, aggregate_only, step_retention, max_step_logs)
+        instance._is_initialized = True  # Set the flag at the end of the initialization
+        return instance
+
+    @override(LogStatsWrapper)
+    def _record_stats_if_ready(self) -> None:
+        """Record the stats of the step and apply the retention policy to the event log afterwards."""
+        # new step logs are detected by identity, as the length of a full ring buffer does not change on appending
+        last_step_log = self._last_step_log()
+        super()._record_stats_if_ready()
+
+        # nothing recorded (e.g. in the middle of a structured step)
+        if self._last_step_log() is last_step_log:
+            return
+
+        # the parent lazily initializes a new event log on the first step of each episode
+        if self.episode_event_log is not self._retained_event_log:
+            self._retained_event_log = self.episode_event_log
+            self._n_step_logs_seen = 0
+            if self.step_retention == "ring_buffer":
+                self.episode_event_log.step_event_logs = deque(self.episode_event_log.step_event_logs,
+                                                               maxlen=self.max_step_logs)
+
+        step_event_logs = self.episode_event_log.step_event_logs
+        self._n_step_logs_seen += 1
+
+        if self.aggregate_only:
+            step_event_logs[-1].events = EventCollection(
+                event for event in step_event_logs[-1].events
+                if event.interface_method.__qualname__ not in self.aggregate_only)
+
+        if self.step_retention == "reservoir":
+            self._sample_previous_step_log(step_event_logs)
+
+    def _last_step_log(self) -> Optional[StepEventLog]:
+        """The most recent step log of the current episode (None if nothing has been recorded yet)."""
+        if not self.episode_event_log or len(self.episode_event_log.step_event_logs) == 0:
+            return None
+        return self.episode_event_log.step_event_logs[-1]
+
+    def _sample_previous_step_log(self, step_event_logs: List[Any]) -> None:
+        """Reservoir sampling (algorithm R) of the step log preceding the most recent one.
+
+        The most recent step log always stays at the end of the list (required e.g. by the KPI calculation).
+
+        :param step_event_logs: The step logs of the current episode, with the new step log appended.
+        """
+        reservoir_size = self.max_step_logs - 1
+        n_candidates = self._n_step_logs_seen - 1
+        if n_candidates <= reservoir_size:
+            return
+
+        # the candidate is the second to last log, remove it or let it replace a random member of the reservoir
+        replace_idx = self.sampling_rng.randint(n_candidates)
+        if replace_idx < reservoir_size:
+            # keep the chronological order by removing the replaced log and keeping the candidate in place
+            del step_event_logs[replace_idx]
+        else:
+            del step_event_logs[-2]
+
+    @override(BaseEnv)
+    def seed(self, seed: Any) -> None:
+        """Seed the sampling of step logs along with the wrapped env."""
+        self.sampling_rng = np.random.RandomState(seed)
+        self.env.seed(seed)